@@ -1,6 +1,9 @@
 """
 Configuration module for the Conversational Research Agent application.
 
+This is the single canonical settings module: every package module reads
+configuration through ``backend.config`` and no other Settings class exists.
+
 This module manages all application settings and environment variables using Pydantic's
 BaseSettings for type validation and automatic loading from .env files.
 
@@ -26,10 +29,31 @@ Note:
     Required environment variables (marked with ...) must be set or the application
     will fail to start with a ValidationError.
 """
-from pydantic_settings import BaseSettings
-from pydantic import Field, validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, field_validator
+from functools import cached_property, lru_cache
 from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+import atexit
 import logging
+import queue
+
+from .utils.filters import PIIRedactingFilter
+
+
+__all__ = ("Settings", "get_settings", "settings", "configure_logging", "stop_logging")
+
+
+# Allowed values for validated string settings
+_VALID_LOG_LEVELS = frozenset({'debug', 'info', 'warning', 'error', 'critical'})
+_VALID_APP_ENVS = frozenset({'development', 'staging', 'production'})
+_VALID_SEARCH_PROVIDERS = frozenset({'mock', 'gemini', 'serpapi', 'brave', 'google'})
+
+_LOG_LEVEL_ERR = "LOG_LEVEL must be one of: " + ", ".join(sorted(_VALID_LOG_LEVELS))
+_APP_ENV_ERR = "APP_ENV must be one of: " + ", ".join(sorted(_VALID_APP_ENVS))
+_SEARCH_PROVIDER_ERR = (
+    "search_provider must be one of: " + ", ".join(sorted(_VALID_SEARCH_PROVIDERS))
+)
 
 
 class Settings(BaseSettings):
@@ -49,6 +73,11 @@ class Settings(BaseSettings):
         POSTGRES_DB (str): PostgreSQL database name. Defaults to 'research'.
         POSTGRES_USER (str): PostgreSQL username. Defaults to 'postgres'.
         POSTGRES_PASSWORD (str): PostgreSQL password. Required for security.
+        POSTGRES_POOL_SIZE (int): Connections kept open in the pool. Defaults to 10.
+        POSTGRES_MAX_OVERFLOW (int): Extra connections allowed under load. Defaults to 20.
+        POSTGRES_POOL_TIMEOUT (int): Seconds to wait for a free connection. Defaults to 30.
+        POSTGRES_POOL_RECYCLE (int): Seconds before a pooled connection is replaced.
+            Defaults to 300.
         REDIS_URL (str): Redis connection URL for caching and rate limiting.
             Defaults to 'redis://redis:6379/0'.
         APP_ENV (str): Application environment (development/staging/production).
@@ -62,6 +91,9 @@ class Settings(BaseSettings):
         Automatically loads variables from a .env file in the project root.
         Case-insensitive environment variable names are supported.
     
+    The model is frozen: instances are immutable (and therefore hashable and
+    safe to share across threads). Assigning to a field raises ValidationError.
+    
     Raises:
         ValidationError: If required fields are missing or values have incorrect types.
     
@@ -76,47 +108,62 @@ class Settings(BaseSettings):
     
     # ==================== API Keys ====================
     # Required for external service integrations
-    GEMINI_API_KEY: str = Field(..., env="GEMINI_API_KEY")
-    LANGSMITH_API_KEY: str = Field(..., env="LANGSMITH_API_KEY")
+    GEMINI_API_KEY: str = Field(...)
+    LANGSMITH_API_KEY: str = Field(...)
     
     # Africa's Talking SMS Gateway
-    AT_USERNAME: str = Field(..., env="AT_USERNAME")
-    AT_API_KEY: str = Field(..., env="AT_API_KEY")
+    AT_USERNAME: str = Field(...)
+    AT_API_KEY: str = Field(...)
     africas_talking_webhook_secret: Optional[str] = Field(
         None,
-        env="AT_WEBHOOK_SECRET",
+        validation_alias="AT_WEBHOOK_SECRET",
         description="Secret for validating Africa's Talking webhooks"
     )
+    max_concurrent_sms_research: int = Field(
+        default=32,
+        ge=1,
+        le=256,
+        description="Maximum SMS research runs in progress per worker"
+    )
+    max_sms_research_per_number: int = Field(
+        default=1,
+        ge=1,
+        le=5,
+        description="Maximum SMS research runs in progress per sender"
+    )
     
     # Search API (optional - defaults to mock if not provided)
     search_api_key: Optional[str] = Field(
         None,
-        env="SEARCH_API_KEY",
         description="API key for search provider (SerpAPI, Brave, Google)"
     )
     search_engine_id: Optional[str] = Field(
         None,
-        env="SEARCH_ENGINE_ID",
         description="Search Engine ID for Google Custom Search"
     )
     search_provider: str = Field(
         default="mock",
-        env="SEARCH_PROVIDER",
         description="Search provider: mock, gemini, serpapi, brave, google"
     )
     
     # ==================== Database Configuration ====================
-    POSTGRES_HOST: str = Field("postgres", env="POSTGRES_HOST")
-    POSTGRES_PORT: int = Field(5432, env="POSTGRES_PORT")
-    POSTGRES_DB: str = Field("research", env="POSTGRES_DB")
-    POSTGRES_USER: str = Field("postgres", env="POSTGRES_USER")
-    POSTGRES_PASSWORD: str = Field(..., env="POSTGRES_PASSWORD")
+    POSTGRES_HOST: str = Field("postgres")
+    POSTGRES_PORT: int = Field(5432)
+    POSTGRES_DB: str = Field("research")
+    POSTGRES_USER: str = Field("postgres")
+    POSTGRES_PASSWORD: str = Field(...)
+    POSTGRES_POOL_SIZE: int = Field(10, ge=1)
+    POSTGRES_MAX_OVERFLOW: int = Field(20, ge=0)
+    POSTGRES_POOL_TIMEOUT: int = Field(30, ge=1)
+    POSTGRES_POOL_RECYCLE: int = Field(300, ge=-1)
     
-    @property
+    @cached_property
     def postgres_url(self) -> str:
         """
         Construct PostgreSQL connection URL.
         
+        Built once per Settings instance and cached on first access.
+        
         Returns:
             Full PostgreSQL connection string for async SQLAlchemy
         """
@@ -126,166 +173,250 @@ class Settings(BaseSettings):
         )
     
     # ==================== Cache Configuration ====================
-    REDIS_URL: str = Field("redis://redis:6379/0", env="REDIS_URL")
+    REDIS_URL: str = Field("redis://redis:6379/0")
     
     # ==================== Application Runtime Settings ====================
-    APP_ENV: str = Field("development", env="APP_ENV")
-    APP_HOST: str = Field("0.0.0.0", env="APP_HOST")
-    APP_PORT: int = Field(8000, env="APP_PORT")
-    LOG_LEVEL: str = Field("info", env="LOG_LEVEL")
+    APP_ENV: str = Field("development")
+    APP_HOST: str = Field("0.0.0.0")
+    APP_PORT: int = Field(8000)
+    LOG_LEVEL: str = Field("info")
     
     # Application metadata
     APP_NAME: str = Field(
-        "Research Agent API",
-        env="APP_NAME"
+        "Research Agent API"
     )
     APP_VERSION: str = Field(
-        "1.0.0",
-        env="APP_VERSION"
+        "1.0.0"
     )
     
     # ==================== LLM Configuration ====================
     llm_model: str = Field(
         default="gemini-1.5-pro",
-        env="LLM_MODEL",
         description="Gemini model to use for generation"
     )
     llm_temperature: float = Field(
         default=0.7,
-        env="LLM_TEMPERATURE",
         ge=0.0,
         le=1.0,
         description="LLM sampling temperature"
     )
     max_tokens: int = Field(
         default=2048,
-        env="MAX_TOKENS",
         ge=100,
         le=8192,
         description="Maximum tokens in LLM response"
     )
+    embedding_model: str = Field(
+        default="models/text-embedding-004",
+        description="Gemini embedding model used for semantic caching"
+    )
+    gemini_use_sdk: bool = Field(
+        default=False,
+        description="Call Gemini through the blocking SDK instead of the async REST API"
+    )
+    llm_requests_per_second: float = Field(
+        default=5.0,
+        gt=0,
+        description="Sustained Gemini request rate per worker (client-side limit)"
+    )
+    llm_burst: int = Field(
+        default=10,
+        ge=1,
+        description="Gemini requests allowed in a burst above the sustained rate"
+    )
+    llm_max_concurrency: int = Field(
+        default=32,
+        ge=1,
+        le=256,
+        description="Maximum Gemini requests in progress per worker"
+    )
     
     # ==================== Research Agent Settings ====================
     max_search_results: int = Field(
         default=10,
-        env="MAX_SEARCH_RESULTS",
         ge=1,
         le=50,
         description="Maximum search results to retrieve per query"
     )
     max_reflection_iterations: int = Field(
         default=3,
-        env="MAX_REFLECTION_ITERATIONS",
         ge=1,
         le=5,
         description="Maximum reflection/iteration loops"
     )
+    search_timeout: float = Field(
+        default=15.0,
+        gt=0,
+        description="Timeout in seconds for a single search sub-query"
+    )
+    max_concurrent_searches: int = Field(
+        default=5,
+        ge=1,
+        le=20,
+        description="Maximum search sub-queries in flight per agent"
+    )
+    synthesis_top_k: int = Field(
+        default=8,
+        ge=1,
+        le=50,
+        description="Documents kept (ranked by similarity to the query) for synthesis"
+    )
+    reflection_convergence_threshold: float = Field(
+        default=0.98,
+        ge=0.0,
+        le=1.0,
+        description="Stop iterating once the document-embedding centroid moves less than this (cosine)"
+    )
+    fulltext_max_chars: int = Field(
+        default=4000,
+        ge=200,
+        le=50000,
+        description="Characters of fetched page text kept per document"
+    )
+    fulltext_max_bytes: int = Field(
+        default=1_048_576,
+        ge=16_384,
+        le=16_777_216,
+        description="Bytes of page HTML read per document before the rest is discarded"
+    )
     
     # ==================== Security & Safety Settings ====================
     enable_pii_filter: bool = Field(
         default=True,
-        env="ENABLE_PII_FILTER",
         description="Enable PII detection and filtering"
     )
     enable_toxicity_filter: bool = Field(
         default=True,
-        env="ENABLE_TOXICITY_FILTER",
         description="Enable toxicity content filtering"
     )
     enable_hallucination_check: bool = Field(
         default=True,
-        env="ENABLE_HALLUCINATION_CHECK",
         description="Enable hallucination detection"
     )
     enable_bias_detection: bool = Field(
         default=True,
-        env="ENABLE_BIAS_DETECTION",
         description="Enable bias detection in outputs"
     )
     enable_prompt_injection_check: bool = Field(
         default=True,
-        env="ENABLE_PROMPT_INJECTION_CHECK",
         description="Enable prompt injection detection"
     )
     
     # ==================== Rate Limiting ====================
     rate_limit_enabled: bool = Field(
         default=True,
-        env="RATE_LIMIT_ENABLED",
         description="Enable rate limiting"
     )
     rate_limit_requests: int = Field(
         default=100,
-        env="RATE_LIMIT_REQUESTS",
         description="Max requests per window"
     )
     rate_limit_window: int = Field(
         default=3600,
-        env="RATE_LIMIT_WINDOW",
         description="Rate limit window in seconds"
     )
     
     # ==================== Feature Flags ====================
     enable_sms: bool = Field(
         default=True,
-        env="ENABLE_SMS",
         description="Enable SMS integration"
     )
     enable_caching: bool = Field(
         default=True,
-        env="ENABLE_CACHING",
         description="Enable response caching"
     )
     enable_metrics: bool = Field(
         default=True,
-        env="ENABLE_METRICS",
         description="Enable metrics collection"
     )
+    enable_fulltext_prefetch: bool = Field(
+        default=False,
+        description="Fetch page text for search results and use it in synthesis"
+    )
+    
+    # ==================== Cache Settings ====================
+    cache_ttl: int = Field(
+        default=3600,
+        ge=1,
+        description="TTL in seconds for cached research responses"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.95,
+        ge=0.0,
+        le=1.0,
+        description="Minimum cosine similarity to reuse a cached response"
+    )
+    semantic_cache_max_entries: int = Field(
+        default=1000,
+        ge=0,
+        description="Query embeddings kept in each worker's semantic index"
+    )
+    query_cache_ttl: int = Field(
+        default=86400,
+        ge=1,
+        description="TTL in seconds for cached LLM-generated search queries"
+    )
+    llm_cache_ttl: int = Field(
+        default=3600,
+        ge=0,
+        description="TTL in seconds for cached LLM completions, in-process and in Redis (0 disables)"
+    )
+    llm_cache_max_entries: int = Field(
+        default=1000,
+        ge=1,
+        description="LLM completions kept in each worker's response cache"
+    )
     
     # ==================== Validators ====================
-    @validator('LOG_LEVEL')
+    @field_validator('LOG_LEVEL')
+    @classmethod
     def validate_log_level(cls, v):
         """Validate log level is valid."""
-        valid_levels = ['debug', 'info', 'warning', 'error', 'critical']
         v_lower = v.lower()
-        if v_lower not in valid_levels:
-            raise ValueError(f"LOG_LEVEL must be one of: {', '.join(valid_levels)}")
+        if v_lower not in _VALID_LOG_LEVELS:
+            raise ValueError(_LOG_LEVEL_ERR)
         return v_lower
     
-    @validator('APP_ENV')
+    @field_validator('APP_ENV')
+    @classmethod
     def validate_app_env(cls, v):
         """Validate app environment."""
-        valid_envs = ['development', 'staging', 'production']
         v_lower = v.lower()
-        if v_lower not in valid_envs:
-            raise ValueError(f"APP_ENV must be one of: {', '.join(valid_envs)}")
+        if v_lower not in _VALID_APP_ENVS:
+            raise ValueError(_APP_ENV_ERR)
         return v_lower
     
-    @validator('search_provider')
+    @field_validator('search_provider')
+    @classmethod
     def validate_search_provider(cls, v):
         """Validate search provider."""
-        valid_providers = ['mock', 'gemini', 'serpapi', 'brave', 'google']
         v_lower = v.lower()
-        if v_lower not in valid_providers:
-            raise ValueError(f"search_provider must be one of: {', '.join(valid_providers)}")
+        if v_lower not in _VALID_SEARCH_PROVIDERS:
+            raise ValueError(_SEARCH_PROVIDER_ERR)
         return v_lower
     
     # ==================== Helper Properties ====================
-    @property
+    # Settings are frozen, so these are computed once and cached per instance
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production environment."""
         return self.APP_ENV == 'production'
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development environment."""
         return self.APP_ENV == 'development'
     
-    @property
+    @cached_property
     def debug(self) -> bool:
         """Check if debug mode is enabled."""
         return self.LOG_LEVEL == 'debug' or self.is_development
     
+    @cached_property
+    def log_level_int(self) -> int:
+        """Logging level constant for LOG_LEVEL, resolved once per instance."""
+        return logging.getLevelName(self.LOG_LEVEL.upper())
+    
     def get_log_level_int(self) -> int:
         """
         Get logging level as integer.
@@ -293,39 +424,149 @@ class Settings(BaseSettings):
         Returns:
             Logging level constant from logging module
         """
-        levels = {
-            'debug': logging.DEBUG,
-            'info': logging.INFO,
-            'warning': logging.WARNING,
-            'error': logging.ERROR,
-            'critical': logging.CRITICAL
-        }
-        return levels.get(self.LOG_LEVEL, logging.INFO)
-    
-    class Config:
-        """Pydantic configuration for Settings class."""
-        env_file = ".env"
-        case_sensitive = False
-        env_file_encoding = 'utf-8'
-
+        return self.log_level_int
+    
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        env_file_encoding="utf-8",
+        extra="ignore",
+        frozen=True,
+        ignored_types=(cached_property,),
+    )
 
-# Global settings instance - import this in other modules
-settings = Settings()
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide Settings instance.
+    
+    The .env file and environment are parsed and validated only on the first
+    call; every later call returns the same cached object. Use this as a
+    FastAPI dependency (``Depends(get_settings)``) or call it directly.
+    
+    Returns:
+        Cached Settings instance
+    
+    Example:
+        >>> get_settings() is get_settings()
+        True
+    """
+    return Settings()
 
-# Configure logging based on settings
-logging.basicConfig(
-    level=settings.get_log_level_int(),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 
-# Log configuration on startup
 logger = logging.getLogger(__name__)
-logger.info(f"Configuration loaded: {settings.APP_NAME} v{settings.APP_VERSION}")
-logger.info(f"Environment: {settings.APP_ENV}")
-logger.info(f"Log level: {settings.LOG_LEVEL}")
-logger.info(f"Search provider: {settings.search_provider}")
-logger.info(f"Safety filters enabled: PII={settings.enable_pii_filter}, "
-           f"Toxicity={settings.enable_toxicity_filter}, "
-           f"Hallucination={settings.enable_hallucination_check}")
+
+# Set once configure_logging() has run so repeated calls are no-ops
+_configured = False
+
+# Background thread writing queued log records, and the root handler feeding it
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def configure_logging() -> None:
+    """
+    Configure root logging from settings and log the loaded configuration.
+    
+    Idempotent: only the first call has any effect. Call it from the
+    application startup hook (FastAPI lifespan) rather than at import time so
+    that importing this module never mutates global logging state.
+    
+    Records are handed to a QueueHandler and written to stderr by a
+    QueueListener thread, keeping log I/O off the event loop. Phone
+    numbers, emails, IPs and IBANs are masked before output by a filter on
+    every root handler, including handlers the host process installed
+    (gunicorn, a test harness, a log shipper).
+    
+    Example:
+        >>> from backend.config import configure_logging
+        >>> configure_logging()
+    """
+    global _configured, _listener, _queue_handler
+    if _configured:
+        return
+    _configured = True
+    
+    settings = get_settings()
+    root = logging.getLogger()
+    root.setLevel(settings.get_log_level_int())
+    
+    # Like basicConfig(), leave existing handlers (e.g. a test harness) alone
+    if not root.handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        
+        # Request handlers only enqueue records; a listener thread formats
+        # them and does the blocking stderr writes
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = QueueHandler(log_queue)
+        root.addHandler(_queue_handler)
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        stream_handler.addFilter(PIIRedactingFilter())
+    else:
+        # Records reach host handlers directly, so each one gets the filter
+        for handler in root.handlers:
+            if not any(isinstance(f, PIIRedactingFilter) for f in handler.filters):
+                handler.addFilter(PIIRedactingFilter())
+    
+    # Log configuration on startup
+    logger.info("Configuration loaded: %s v%s", settings.APP_NAME, settings.APP_VERSION)
+    logger.info("Environment: %s", settings.APP_ENV)
+    logger.info("Log level: %s", settings.LOG_LEVEL)
+    logger.info("Search provider: %s", settings.search_provider)
+    logger.info(
+        "Safety filters enabled: PII=%s, Toxicity=%s, Hallucination=%s",
+        settings.enable_pii_filter,
+        settings.enable_toxicity_filter,
+        settings.enable_hallucination_check,
+    )
+
+
+def stop_logging() -> None:
+    """
+    Flush queued log records and stop the listener thread.
+    
+    Called from the application shutdown hook (and at interpreter exit).
+    Safe to call more than once; a later configure_logging() call sets
+    logging up again.
+    """
+    global _configured, _listener, _queue_handler
+    if _listener is None:
+        return
+    
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    _listener = None
+    _queue_handler = None
+    _configured = False
+
+
+def __getattr__(name: str):
+    """
+    Lazily create the global ``settings`` instance (PEP 562).
+    
+    ``from backend.config import settings`` resolves here on first use, so
+    importing this module no longer reads the .env file, runs validators or
+    touches logging. Once built, the instance is stored in the module
+    globals and this hook is bypassed.
+    
+    Args:
+        name: Attribute being looked up on the module
+    
+    Returns:
+        The global Settings instance
+    
+    Raises:
+        AttributeError: For any name other than ``settings``
+    """
+    if name == "settings":
+        instance = get_settings()
+        globals()["settings"] = instance
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,39 @@
+"""
+FastAPI Dependencies
+
+Shared dependencies injected into route handlers with ``Depends``.
+Long-lived resources are created once in the application lifespan and
+stored on ``app.state``; these functions hand them to the routes.
+"""
+
+from fastapi import HTTPException, Request, status
+
+from .langgraph_agent import ResearchAgent
+
+
+def get_agent(request: Request) -> ResearchAgent:
+    """
+    Resolve the research agent created during application startup.
+    
+    Args:
+        request: Incoming request
+    
+    Returns:
+        The application's shared ResearchAgent
+    
+    Raises:
+        HTTPException: 503 if the agent has not been initialized
+    
+    Example:
+        >>> @router.post("/research")
+        ... async def run_research(agent: ResearchAgent = Depends(get_agent)):
+        ...     return await agent.run("What is quantum computing?")
+    """
+    agent = getattr(request.app.state, "agent", None)
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Research agent is not initialized"
+        )
+    return agent
+
@@ -8,8 +8,9 @@ Workflow:
 1. Query Generation - Generate optimized search queries
 2. Web Search - Execute searches and gather results
 3. Reflection - Evaluate result quality and decide on iteration
-4. Synthesis - Generate final answer with citations
-5. Quality Check - Validate answer quality and citations
+4. Rerank - Keep the documents most similar to the query
+5. Synthesis - Generate final answer with citations
+6. Quality Check - Validate answer quality and citations
 
 The agent uses LangGraph's state management and node system for
 reliable, traceable execution.
@@ -17,18 +18,27 @@ reliable, traceable execution.
 
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, TypedDict
-from datetime import datetime
+import copy
+import functools
+import hashlib
+import os
+from typing import Dict, Any, AsyncIterator, Awaitable, Iterator, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 import time
 
+import httpx
+from langgraph.graph import StateGraph, START, END
+
 from .services import search, synthesis
 from .services.llm import get_llm, generate_search_queries
 from .utils import filters
+from .utils.cache import semantic_cache, normalize_query
 from .utils.db import (
     create_research_query,
-    update_query_status,
     save_research_result,
-    add_timeline_step
+    complete_research_query
 )
 from .config import settings
 
@@ -37,35 +47,61 @@ logger = logging.getLogger(__name__)
 
 # ==================== State Definition ====================
 
-class AgentState(TypedDict):
+@dataclass(slots=True)
+class AgentState:
     """
     State object passed between agent nodes.
     
-    Contains all information needed for research workflow.
+    Contains all information needed for research workflow. Slotted so each
+    node's field reads and writes are attribute accesses, not dict lookups.
     """
     # Input
     query: str
     source: str
     max_iterations: int
     
+    # Timing: monotonic start plus the wall-clock time it corresponds to
+    start_ns: int
+    started_at: datetime
+    
     # Generated data
-    search_queries: List[str]
-    documents: List[Dict[str, Any]]
-    answer: str
-    citations: List[Dict]
+    query_embedding: Optional[List[float]] = None
+    search_queries: List[str] = field(default_factory=list)
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    seen_urls: Set[str] = field(default_factory=set)
+    # Documents found by search, before rerank trims them to synthesis_top_k
+    sources_found: int = 0
+    # Unit document embeddings by URL, shared by reflection and rerank
+    doc_vectors: Dict[str, Tuple[float, ...]] = field(default_factory=dict)
+    # Document-embedding centroid as of the previous reflection
+    prev_centroid: Optional[Tuple[float, ...]] = None
+    answer: str = ''
+    citations: List[Dict] = field(default_factory=list)
     
     # Metadata
-    iteration_count: int
-    should_continue: bool
-    timeline: List[Dict[str, Any]]
-    confidence_score: float
+    iteration_count: int = 0
+    should_continue: bool = True
+    timeline: List[Dict[str, Any]] = field(default_factory=list)
+    confidence_score: float = 0.0
     
     # Database
-    query_id: Optional[int]
-    start_time: float
+    query_id: Optional[int] = None
+    result_id: Optional[int] = None
     
     # Errors
-    errors: List[str]
+    errors: List[str] = field(default_factory=list)
+    
+    # Search for the raw query, started alongside query generation
+    speculative_search: Optional[asyncio.Task] = None
+    
+    # Page-text fetches for new documents, awaited before synthesis
+    prefetch_tasks: List[asyncio.Task] = field(default_factory=list)
+    
+    # Pending fire-and-forget DB writes
+    bg_tasks: Set[asyncio.Task] = field(default_factory=set)
+    
+    # Progress events for stream() consumers (None when not streaming)
+    events: Optional[asyncio.Queue] = None
 
 
 class ResearchAgent:
@@ -75,11 +111,130 @@ class ResearchAgent:
     Orchestrates the research workflow with reflection and iteration.
     """
     
-    def __init__(self):
-        """Initialize research agent."""
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize research agent.
+        
+        Args:
+            http: Shared HTTP client for searches and page fetches. The
+                caller keeps ownership and closes it; when omitted the agent
+                creates and closes its own.
+        """
         self.llm = get_llm()
+        logger.debug("Using shared LLM client %s (%s)", self.llm.model_name, get_llm.cache_info())
+        # Caps concurrent sub-query searches to respect provider rate limits
+        self._search_semaphore = asyncio.Semaphore(settings.max_concurrent_searches)
+        # Tasks of running queries, so identical concurrent requests share one
+        # run, with the number of callers still waiting on each
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        # Pooled HTTP/2 client shared by all searches, so sub-queries reuse
+        # connections instead of paying a TLS handshake each
+        self._owns_http = http is None
+        self.http = http or httpx.AsyncClient(
+            http2=True,
+            timeout=settings.search_timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+        # Bounded pool for the pure-Python vector math, so scoring many
+        # embeddings doesn't stall other requests on the event loop
+        self._cpu_workers = min(4, os.cpu_count() or 1)
+        self._cpu_pool = ThreadPoolExecutor(
+            max_workers=self._cpu_workers,
+            thread_name_prefix="agent-cpu"
+        )
+        # Compiled once and reused by every run
+        self.graph = self._build_graph()
         logger.info("Research agent initialized")
     
+    def _build_graph(self):
+        """
+        Build and compile the workflow graph.
+        
+        generate_queries -> search <-> reflection -> rerank -> synthesis
+        -> finalize, where search and reflection loop until reflection
+        stops asking for more results or max_iterations is reached.
+        
+        Returns:
+            Compiled LangGraph graph
+        """
+        graph = StateGraph(AgentState)
+        graph.add_node("generate_queries", self._generate_queries_node)
+        graph.add_node("search", self._search_node)
+        graph.add_node("reflection", self._reflection_node)
+        graph.add_node("rerank", self._rerank_node)
+        graph.add_node("synthesis", self._synthesis_node)
+        graph.add_node("finalize", self._finalize_node)
+        
+        graph.add_edge(START, "generate_queries")
+        graph.add_edge("generate_queries", "search")
+        graph.add_conditional_edges("search", self._route_after_search, ["reflection", "rerank"])
+        graph.add_conditional_edges("reflection", self._route_after_reflection, ["search", "rerank"])
+        graph.add_edge("rerank", "synthesis")
+        graph.add_edge("synthesis", "finalize")
+        graph.add_edge("finalize", END)
+        
+        # No checkpointer: the state holds live tasks and queues that can't
+        # be serialized, and runs are never resumed
+        return graph.compile()
+    
+    async def close(self) -> None:
+        """
+        Close the worker pool and, if the agent created it, the HTTP client.
+        
+        Call on application shutdown.
+        """
+        if self._owns_http:
+            await self.http.aclose()
+        self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+    
+    async def warmup(self, timeout: float = 5.0) -> None:
+        """
+        Prepare lazily created resources before the first request.
+        
+        Starts the worker pool threads and opens a pooled connection to the
+        configured search provider, so the first query after a deploy
+        doesn't pay thread start-up and the TLS handshake. Best effort:
+        failures are logged and startup continues.
+        
+        Args:
+            timeout: Seconds to wait for the search provider connection
+        
+        Example:
+            >>> agent = ResearchAgent()
+            >>> await agent.warmup()
+        """
+        # One no-op per worker; concurrent submits make the pool spawn them all
+        await asyncio.gather(*(
+            self._offload(time.sleep, 0.01) for _ in range(self._cpu_workers)
+        ))
+        
+        base_url = getattr(search.search_service.provider, 'base_url', None)
+        if base_url:
+            try:
+                await self.http.head(httpx.URL(base_url).copy_with(path="/"), timeout=timeout)
+            except httpx.HTTPError as e:
+                logger.warning("Search provider warmup failed: %s", e)
+        
+        logger.info("Research agent warmed up")
+    
+    async def _offload(self, fn, *args, **kwargs):
+        """
+        Run a blocking function on the agent's worker pool.
+        
+        Args:
+            fn: Synchronous callable
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+            
+        Returns:
+            The callable's return value
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._cpu_pool,
+            functools.partial(fn, *args, **kwargs)
+        )
+    
     async def run(
         self,
         query: str,
@@ -89,6 +244,12 @@ class ResearchAgent:
         """
         Execute research workflow for a query.
         
+        Consumes stream() and returns only the final response. Identical
+        queries from the same source arriving while one is already running
+        await that run instead of starting another. The run has its own
+        task: one caller being cancelled never cancels it for the others,
+        and it is only cancelled once every caller has gone.
+        
         Args:
             query: Research question
             source: Query source (web_ui, sms, api)
@@ -107,6 +268,121 @@ class ResearchAgent:
             >>> print(result['answer'])
             >>> print(len(result['citations']))
         """
+        # Source is part of the key so every caller's metadata and stored
+        # row carry its own source
+        key = hashlib.sha256(
+            f"{source}:{normalize_query(query or '')}:{max_iterations}".encode()
+        ).hexdigest()
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_once(query, source, max_iterations))
+            self._inflight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda t: self._run_finished(key, t))
+        else:
+            logger.info("Joining in-flight research for query: %.50s...", query)
+        
+        self._waiters[task] += 1
+        try:
+            # Shield so a cancelled caller doesn't cancel the shared run;
+            # copy because callers sanitize the response in place
+            return copy.deepcopy(await asyncio.shield(task))
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                # Last caller gone; nobody is left to use the result
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+    
+    async def _run_once(
+        self,
+        query: str,
+        source: str,
+        max_iterations: Optional[int]
+    ) -> Dict[str, Any]:
+        """Run the workflow to completion and return the final response."""
+        response = None
+        async for event in self.stream(query, source, max_iterations):
+            if event['type'] == 'answer':
+                response = event['data']
+        return response
+    
+    def _run_finished(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished run from the in-flight map."""
+        self._inflight.pop(key, None)
+        self._waiters.pop(task, None)
+        # Mark retrieved so unjoined failures don't log "never retrieved"
+        if not task.cancelled():
+            task.exception()
+    
+    async def stream(
+        self,
+        query: str,
+        source: str = 'web_ui',
+        max_iterations: int = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute research workflow, yielding progress as each node completes.
+        
+        Yields ``{'type': 'step', 'data': timeline_entry}`` after every node
+        and finally ``{'type': 'answer', 'data': response}`` with the same
+        response run() returns.
+        
+        Args:
+            query: Research question
+            source: Query source (web_ui, sms, api)
+            max_iterations: Maximum reflection iterations
+            
+        Yields:
+            Progress event dictionaries
+            
+        Raises:
+            ValueError: If query is invalid
+            
+        Example:
+            >>> async for event in agent.stream("What is quantum computing?"):
+            ...     print(event['type'])
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(
+            self._execute(query, source, max_iterations, events)
+        )
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            yield {'type': 'answer', 'data': task.result()}
+        finally:
+            # Consumer stopped early; don't leave the workflow running
+            if not task.done():
+                task.cancel()
+    
+    async def _execute(
+        self,
+        query: str,
+        source: str,
+        max_iterations: Optional[int],
+        events: Optional[asyncio.Queue] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the research workflow, publishing timeline steps to ``events``.
+        
+        Args:
+            query: Research question
+            source: Query source (web_ui, sms, api)
+            max_iterations: Maximum reflection iterations
+            events: Optional queue receiving step events
+            
+        Returns:
+            Dictionary with answer, citations, and timeline
+            
+        Raises:
+            ValueError: If query is invalid
+        """
         # Validate input
         if not query or not query.strip():
             raise ValueError("Query cannot be empty")
@@ -114,26 +390,42 @@ class ResearchAgent:
         if max_iterations is None:
             max_iterations = settings.max_reflection_iterations
         
+        start_ns = time.monotonic_ns()
+        
+        # Serve repeated or paraphrased questions from the response cache
+        query_embedding = None
+        if settings.enable_caching and semantic_cache.available:
+            cached = await semantic_cache.get_exact(query)
+            if cached is None:
+                query_embedding = await self._embed_query(query)
+                if query_embedding:
+                    cached = await semantic_cache.get_similar(query_embedding)
+            
+            if cached is not None:
+                logger.info("Serving cached research result for query: %.50s...", query)
+                # The stored entry belongs to the run that produced it; keep
+                # its answer and citations but not that caller's source or steps
+                cached['query'] = query
+                cached['timeline'] = []
+                cached['completed_at'] = datetime.utcnow()
+                cached['total_duration_ms'] = self._elapsed_ms(start_ns)
+                metadata = cached.setdefault('metadata', {})
+                metadata['source'] = source
+                metadata['cache_hit'] = True
+                return cached
+        
         # Initialize state
-        start_time = time.time()
-        state: AgentState = {
-            'query': query.strip(),
-            'source': source,
-            'max_iterations': max_iterations,
-            'search_queries': [],
-            'documents': [],
-            'answer': '',
-            'citations': [],
-            'iteration_count': 0,
-            'should_continue': True,
-            'timeline': [],
-            'confidence_score': 0.0,
-            'query_id': None,
-            'start_time': start_time,
-            'errors': []
-        }
+        state = AgentState(
+            query=query.strip(),
+            source=source,
+            max_iterations=max_iterations,
+            start_ns=start_ns,
+            started_at=datetime.utcnow(),
+            query_embedding=query_embedding,
+            events=events
+        )
         
-        logger.info(f"Starting research for query: {query[:50]}...")
+        logger.info("Starting research for query: %.50s...", query)
         
         # Create database record
         try:
@@ -141,99 +433,230 @@ class ResearchAgent:
                 query_text=query,
                 source=source
             )
-            state['query_id'] = db_query.id
-            logger.info(f"Created database record with ID: {db_query.id}")
+            state.query_id = db_query.id
+            logger.info("Created database record with ID: %s", db_query.id)
         except Exception as e:
-            logger.error(f"Failed to create DB record: {str(e)}")
+            logger.error("Failed to create DB record: %s", e)
             # Continue without DB persistence
         
         # Execute workflow
         try:
-            # Node 1: Generate search queries
-            state = await self._generate_queries_node(state)
+            state = AgentState(**await self.graph.ainvoke(state))
             
-            # Node 2: Execute searches
-            state = await self._search_node(state)
+            duration_ms = self._elapsed_ms(start_ns)
+            completed_at = state.started_at + timedelta(milliseconds=duration_ms)
+            timeline = self._timeline_out(state)
             
-            # Reflection loop
-            while state['should_continue'] and state['iteration_count'] < max_iterations:
-                # Node 3: Reflect on results
-                state = await self._reflection_node(state)
-                
-                # If need more results, search again
-                if state['should_continue'] and state['iteration_count'] < max_iterations:
-                    state = await self._search_node(state)
-            
-            # Node 4: Synthesize answer
-            state = await self._synthesis_node(state)
-            
-            # Node 5: Quality check
-            state = await self._quality_check_node(state)
-            
-            # Update database
-            if state['query_id']:
-                try:
-                    duration_ms = int((time.time() - start_time) * 1000)
-                    await update_query_status(
-                        query_id=state['query_id'],
-                        status='completed',
-                        completed_at=datetime.utcnow(),
-                        duration_ms=duration_ms,
-                        iterations=state['iteration_count']
-                    )
-                    
-                    await save_research_result(
-                        query_id=state['query_id'],
-                        answer=state['answer'],
-                        citations=state['citations'],
-                        confidence_score=state['confidence_score']
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to update DB: {str(e)}")
+            # Persist status, confidence and timeline in one background write
+            if state.query_id:
+                self._fire(state, complete_research_query(
+                    query_id=state.query_id,
+                    status='completed',
+                    timeline=timeline,
+                    completed_at=completed_at,
+                    duration_ms=duration_ms,
+                    iterations=state.iteration_count,
+                    # Insert the result here only if the early save failed
+                    answer=None if state.result_id is not None else state.answer,
+                    citations=state.citations,
+                    confidence_score=state.confidence_score,
+                    result_id=state.result_id
+                ))
             
             # Build response
-            return {
-                'answer': state['answer'],
-                'citations': state['citations'],
-                'timeline': state['timeline'],
+            response = {
+                'answer': state.answer,
+                'citations': state.citations,
+                'timeline': timeline,
                 'query': query,
-                'completed_at': datetime.utcnow(),
-                'total_duration_ms': int((time.time() - start_time) * 1000),
+                'completed_at': completed_at,
+                'total_duration_ms': duration_ms,
                 'metadata': {
-                    'iterations': state['iteration_count'],
-                    'sources_found': len(state['documents']),
-                    'confidence_score': state['confidence_score'],
+                    'iterations': state.iteration_count,
+                    'sources_found': max(state.sources_found, len(state.documents)),
+                    'sources_used': len(state.documents),
+                    'confidence_score': state.confidence_score,
                     'source': source
                 }
             }
+            
+            # Only cache answers that are backed by sources
+            if settings.enable_caching and semantic_cache.available and state.citations:
+                await semantic_cache.set(query, response, state.query_embedding)
+            
+            await self._drain_background(state)
+            return response
         
         except Exception as e:
-            logger.error(f"Research workflow failed: {str(e)}", exc_info=True)
+            logger.error("Research workflow failed: %s", e, exc_info=True)
+            
+            duration_ms = self._elapsed_ms(start_ns)
+            timeline = self._timeline_out(state)
             
             # Update DB as failed
-            if state.get('query_id'):
-                try:
-                    await update_query_status(
-                        query_id=state['query_id'],
-                        status='failed'
-                    )
-                except:
-                    pass
+            if state.query_id:
+                self._fire(state, complete_research_query(
+                    query_id=state.query_id,
+                    status='failed',
+                    timeline=timeline
+                ))
+            await self._drain_background(state)
             
             # Return error response
             return {
                 'answer': f"I apologize, but I encountered an error while researching your question: {str(e)}",
                 'citations': [],
-                'timeline': state.get('timeline', []),
+                'timeline': timeline,
                 'query': query,
-                'completed_at': datetime.utcnow(),
-                'total_duration_ms': int((time.time() - start_time) * 1000),
+                'completed_at': state.started_at + timedelta(milliseconds=duration_ms),
+                'total_duration_ms': duration_ms,
                 'metadata': {
                     'error': str(e),
                     'source': source
                 }
             }
     
+    def _record_step(self, state: AgentState, entry: Dict[str, Any]) -> None:
+        """
+        Append a timeline entry and publish it to any stream() consumer.
+        
+        Args:
+            state: Current agent state
+            entry: Timeline entry for the completed node
+        """
+        state.timeline.append(entry)
+        if state.events is not None:
+            state.events.put_nowait(
+                {'type': 'step', 'data': self._step_out(state, entry)}
+            )
+    
+    @staticmethod
+    def _elapsed_ms(since_ns: int) -> int:
+        """Milliseconds elapsed since a ``time.monotonic_ns()`` reading."""
+        return (time.monotonic_ns() - since_ns) // 1_000_000
+    
+    @staticmethod
+    def _step_out(state: AgentState, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a timeline entry with its monotonic timestamp as a datetime.
+        
+        Timestamps are kept as ``time.monotonic_ns()`` readings while the
+        workflow runs and anchored to the request's wall-clock start only
+        when serialized, so clock jumps can't skew durations.
+        
+        Args:
+            state: Current agent state
+            entry: Timeline entry with an integer timestamp
+            
+        Returns:
+            Timeline entry with a datetime timestamp
+        """
+        offset_us = (entry['timestamp'] - state.start_ns) // 1000
+        return {**entry, 'timestamp': state.started_at + timedelta(microseconds=offset_us)}
+    
+    def _timeline_out(self, state: AgentState) -> List[Dict[str, Any]]:
+        """Serialize the whole timeline for the response and the DB."""
+        return [self._step_out(state, entry) for entry in state.timeline]
+    
+    def _fire(self, state: AgentState, coro: Awaitable) -> asyncio.Task:
+        """
+        Run a DB write in the background, off the request's critical path.
+        
+        The task is tracked in ``state.bg_tasks`` so run() can wait for
+        pending writes before returning; failures are logged, never raised.
+        
+        Args:
+            state: Current agent state
+            coro: Coroutine performing the write
+            
+        Returns:
+            The scheduled task
+        """
+        task = asyncio.create_task(coro)
+        state.bg_tasks.add(task)
+        
+        def _done(t: asyncio.Task) -> None:
+            state.bg_tasks.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                logger.error("Background DB write failed: %s", t.exception())
+        
+        task.add_done_callback(_done)
+        return task
+    
+    async def _drain_background(self, state: AgentState) -> None:
+        """Wait for pending background DB writes to finish."""
+        if state.bg_tasks:
+            await asyncio.gather(*state.bg_tasks, return_exceptions=True)
+    
+    def _wants_more_results(self, state: AgentState) -> bool:
+        """Whether the search/reflection loop should go round again."""
+        return state.should_continue and state.iteration_count < state.max_iterations
+    
+    def _route_after_search(self, state: AgentState) -> str:
+        """Route after search: reflect on the results, or move on to rerank."""
+        return "reflection" if self._wants_more_results(state) else "rerank"
+    
+    def _route_after_reflection(self, state: AgentState) -> str:
+        """Route after reflection: search again, or move on to rerank."""
+        return "search" if self._wants_more_results(state) else "rerank"
+    
+    async def _finalize_node(self, state: AgentState) -> AgentState:
+        """
+        Node: Quality check, overlapped with saving the synthesized answer.
+        
+        Args:
+            state: Agent state after synthesis
+            
+        Returns:
+            Updated state with confidence score and saved result ID
+        """
+        state, state.result_id = await asyncio.gather(
+            self._quality_check_node(state),
+            self._persist_synthesis(state)
+        )
+        return state
+    
+    async def _persist_synthesis(self, state: AgentState) -> Optional[int]:
+        """
+        Save the synthesized answer while the quality check runs.
+        
+        Args:
+            state: Agent state after synthesis
+            
+        Returns:
+            ID of the saved result, or None if not saved
+        """
+        if not state.query_id:
+            return None
+        
+        try:
+            result = await save_research_result(
+                query_id=state.query_id,
+                answer=state.answer,
+                citations=state.citations
+            )
+            return result.id
+        except Exception as e:
+            logger.error("Failed to save research result: %s", e)
+            return None
+    
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
+        """
+        Embed the query for the semantic cache.
+        
+        Args:
+            query: Research question
+            
+        Returns:
+            Query embedding, or None if embedding failed
+        """
+        try:
+            embeddings = await self.llm.embed([query])
+            return embeddings[0]
+        except Exception as e:
+            logger.warning("Query embedding failed: %s", e)
+            return None
+    
     async def _generate_queries_node(self, state: AgentState) -> AgentState:
         """
         Node: Generate optimized search queries.
@@ -244,47 +667,43 @@ class ResearchAgent:
         Returns:
             Updated state with search queries
         """
-        step_start = time.time()
+        step_start = time.monotonic_ns()
         logger.info("Node: Generate search queries")
         
+        # The raw question is itself a usable search, so start it now and
+        # hide query-generation latency behind it; the search node merges it
+        state.speculative_search = asyncio.create_task(self._bounded_search(state.query))
+        # Mark any failure retrieved; the search node reports it
+        state.speculative_search.add_done_callback(lambda t: t.cancelled() or t.exception())
+        
         try:
             # Generate queries using LLM
             queries = await generate_search_queries(
-                state['query'],
+                state.query,
                 num_queries=3
             )
             
-            state['search_queries'] = queries
+            state.search_queries = queries
             
             # Add to timeline
-            duration_ms = int((time.time() - step_start) * 1000)
+            duration_ms = self._elapsed_ms(step_start)
             timeline_entry = {
                 'step': 'query_generation',
                 'description': f'Generated {len(queries)} search queries',
                 'details': {'queries': queries},
-                'timestamp': datetime.utcnow(),
+                'timestamp': step_start,
                 'duration_ms': duration_ms,
                 'status': 'success'
             }
-            state['timeline'].append(timeline_entry)
-            
-            # Save to database
-            if state.get('query_id'):
-                await add_timeline_step(
-                    query_id=state['query_id'],
-                    step_name='query_generation',
-                    description=timeline_entry['description'],
-                    details=timeline_entry['details'],
-                    duration_ms=duration_ms
-                )
+            self._record_step(state, timeline_entry)
             
-            logger.info(f"Generated queries: {queries}")
+            logger.info("Generated %d queries: %s", len(queries), queries)
         
         except Exception as e:
-            logger.error(f"Query generation failed: {str(e)}")
-            state['errors'].append(f"Query generation: {str(e)}")
+            logger.error("Query generation failed: %s", e)
+            state.errors.append(f"Query generation: {str(e)}")
             # Fallback to original query
-            state['search_queries'] = [state['query']]
+            state.search_queries = [state.query]
         
         return state
     
@@ -298,61 +717,124 @@ class ResearchAgent:
         Returns:
             Updated state with search results
         """
-        step_start = time.time()
+        step_start = time.monotonic_ns()
         logger.info("Node: Execute web searches")
         
+        sub_queries = list(state.search_queries)
+        extra: List[Awaitable] = []
+        
+        # First pass: join the speculative search for the raw query instead
+        # of searching it again
+        speculative, state.speculative_search = state.speculative_search, None
+        if speculative is not None:
+            original = normalize_query(state.query)
+            sub_queries = [q for q in sub_queries if normalize_query(q) != original]
+            extra.append(speculative)
+        pending = [self._bounded_search(q) for q in sub_queries] + extra
+        if speculative is not None:
+            sub_queries.append(state.query)
+        
         try:
-            # Search with all generated queries
-            results = await search.search_with_queries(state['search_queries'])
+            # Search all queries concurrently; one failure or timeout must
+            # not discard the other queries' results
+            outcomes = await asyncio.gather(*pending, return_exceptions=True)
             
-            # Add to existing documents (for iterations)
-            state['documents'].extend(results)
-            
-            # Deduplicate by URL
-            seen_urls = set()
-            unique_docs = []
-            for doc in state['documents']:
+            # Stream every result straight into the document list; only
+            # unseen URLs are appended, so nothing already kept is copied
+            num_results = 0
+            for doc in self._merge_results(state, sub_queries, outcomes):
+                num_results += 1
                 url = doc.get('url', '')
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_docs.append(doc)
-            
-            state['documents'] = unique_docs
+                if url and url not in state.seen_urls:
+                    state.seen_urls.add(url)
+                    state.documents.append(doc)
+                    # Fetch page text while reflection and rerank run
+                    if settings.enable_fulltext_prefetch and 'full_text' not in doc:
+                        state.prefetch_tasks.append(
+                            asyncio.create_task(self._prefetch_text(doc))
+                        )
             
             # Add to timeline
-            duration_ms = int((time.time() - step_start) * 1000)
+            duration_ms = self._elapsed_ms(step_start)
             timeline_entry = {
                 'step': 'web_search',
-                'description': f'Found {len(results)} results from {len(state["search_queries"])} queries',
+                'description': f'Found {num_results} results from {len(sub_queries)} queries',
                 'details': {
-                    'num_queries': len(state['search_queries']),
-                    'num_results': len(results),
-                    'total_documents': len(state['documents'])
+                    'num_queries': len(sub_queries),
+                    'num_results': num_results,
+                    'total_documents': len(state.documents)
                 },
-                'timestamp': datetime.utcnow(),
+                'timestamp': step_start,
                 'duration_ms': duration_ms,
                 'status': 'success'
             }
-            state['timeline'].append(timeline_entry)
-            
-            # Save to database
-            if state.get('query_id'):
-                await add_timeline_step(
-                    query_id=state['query_id'],
-                    step_name='web_search',
-                    description=timeline_entry['description'],
-                    details=timeline_entry['details'],
-                    duration_ms=duration_ms
-                )
+            self._record_step(state, timeline_entry)
             
-            logger.info(f"Found {len(state['documents'])} total documents")
+            logger.info("Found %d total documents", len(state.documents))
         
         except Exception as e:
-            logger.error(f"Web search failed: {str(e)}")
-            state['errors'].append(f"Web search: {str(e)}")
+            logger.error("Web search failed: %s", e)
+            state.errors.append(f"Web search: {str(e)}")
         
         return state
     
+    async def _prefetch_text(self, doc: Dict[str, Any]) -> None:
+        """
+        Fetch a document's page text into ``doc['full_text']``.
+        
+        Args:
+            doc: Search result document (updated in place)
+        """
+        text = await search.fetch_page_text(doc['url'], client=self.http)
+        if text:
+            doc['full_text'] = text
+    
+    @staticmethod
+    def _merge_results(
+        state: AgentState,
+        sub_queries: List[str],
+        outcomes: List[Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the documents of each successful sub-query search in order.
+        
+        Failed searches are logged and recorded in ``state.errors`` instead.
+        
+        Args:
+            state: Current agent state
+            sub_queries: Queries searched, aligned with outcomes
+            outcomes: Result lists or exceptions from asyncio.gather
+            
+        Yields:
+            Search result documents
+        """
+        for sub_query, outcome in zip(sub_queries, outcomes):
+            if isinstance(outcome, BaseException):
+                error = str(outcome) or type(outcome).__name__
+                logger.warning("Search failed for '%s': %s", sub_query, error)
+                state.errors.append(f"Web search ({sub_query}): {error}")
+            else:
+                yield from outcome
+    
+    async def _bounded_search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Run a single sub-query search under the concurrency limit.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Search results for the query
+            
+        Raises:
+            asyncio.TimeoutError: If the search exceeds settings.search_timeout
+        """
+        async with self._search_semaphore:
+            return await asyncio.wait_for(
+                search.run_search(query, num_results=5, client=self.http),
+                timeout=settings.search_timeout
+            )
+    
     async def _reflection_node(self, state: AgentState) -> AgentState:
         """
         Node: Reflect on result quality and decide on iteration.
@@ -363,65 +845,189 @@ class ResearchAgent:
         Returns:
             Updated state with reflection decision
         """
-        step_start = time.time()
+        step_start = time.monotonic_ns()
         logger.info("Node: Reflection")
         
-        state['iteration_count'] += 1
+        state.iteration_count += 1
         
         try:
             # Check if we have enough results
-            num_docs = len(state['documents'])
+            num_docs = len(state.documents)
             min_docs = 3
             
             if num_docs >= min_docs:
                 # Sufficient results
-                state['should_continue'] = False
+                state.should_continue = False
                 decision = "sufficient_results"
                 reason = f"Found {num_docs} documents, proceeding to synthesis"
             else:
                 # Need more results
-                if state['iteration_count'] < state['max_iterations']:
-                    state['should_continue'] = True
-                    decision = "need_more_results"
-                    reason = f"Only {num_docs} documents found, will search again"
+                if state.iteration_count < state.max_iterations:
+                    if await self._results_converged(state):
+                        # The last search didn't shift the result set
+                        state.should_continue = False
+                        decision = "converged"
+                        reason = f"New results add little beyond {num_docs} documents, proceeding to synthesis"
+                    else:
+                        state.should_continue = True
+                        decision = "need_more_results"
+                        reason = f"Only {num_docs} documents found, will search again"
                 else:
-                    state['should_continue'] = False
+                    state.should_continue = False
                     decision = "max_iterations_reached"
-                    reason = f"Reached maximum iterations ({state['max_iterations']})"
+                    reason = f"Reached maximum iterations ({state.max_iterations})"
             
             # Add to timeline
-            duration_ms = int((time.time() - step_start) * 1000)
+            duration_ms = self._elapsed_ms(step_start)
             timeline_entry = {
                 'step': 'reflection',
                 'description': reason,
                 'details': {
                     'decision': decision,
                     'num_documents': num_docs,
-                    'iteration': state['iteration_count'],
-                    'continue': state['should_continue']
+                    'iteration': state.iteration_count,
+                    'continue': state.should_continue
                 },
-                'timestamp': datetime.utcnow(),
+                'timestamp': step_start,
                 'duration_ms': duration_ms,
                 'status': 'success'
             }
-            state['timeline'].append(timeline_entry)
-            
-            # Save to database
-            if state.get('query_id'):
-                await add_timeline_step(
-                    query_id=state['query_id'],
-                    step_name='reflection',
-                    description=timeline_entry['description'],
-                    details=timeline_entry['details'],
-                    duration_ms=duration_ms
-                )
+            self._record_step(state, timeline_entry)
             
-            logger.info(f"Reflection: {decision} - {reason}")
+            logger.info("Reflection: %s - %s", decision, reason)
         
         except Exception as e:
-            logger.error(f"Reflection failed: {str(e)}")
-            state['errors'].append(f"Reflection: {str(e)}")
-            state['should_continue'] = False
+            logger.error("Reflection failed: %s", e)
+            state.errors.append(f"Reflection: {str(e)}")
+            state.should_continue = False
+        
+        return state
+    
+    async def _document_vectors(self, state: AgentState) -> List[Tuple[float, ...]]:
+        """
+        Unit embeddings for the current documents, in document order.
+        
+        Only documents not seen by an earlier call are embedded (in one
+        batch); the rest come from ``state.doc_vectors``.
+        
+        Args:
+            state: Current agent state
+            
+        Returns:
+            One normalized vector per document
+        """
+        keys = [doc.get('url') or doc.get('title', '') for doc in state.documents]
+        missing = [
+            (key, doc) for key, doc in zip(keys, state.documents)
+            if key not in state.doc_vectors
+        ]
+        if missing:
+            vectors = await self.llm.embed(
+                [f"{doc.get('title', '')}\n{doc.get('snippet', '')}" for _, doc in missing],
+                task_type="retrieval_document"
+            )
+            units = await self._offload(lambda: [filters.unit_vector(v) for v in vectors])
+            for (key, _), unit in zip(missing, units):
+                state.doc_vectors[key] = unit
+        return [state.doc_vectors[key] for key in keys]
+    
+    @staticmethod
+    def _centroid(vectors: List[Tuple[float, ...]]) -> Tuple[float, ...]:
+        """Direction of the mean of unit vectors, as a unit vector."""
+        return filters.unit_vector([sum(column) for column in zip(*vectors)])
+    
+    async def _results_converged(self, state: AgentState) -> bool:
+        """
+        Whether the document set has stopped moving between reflections.
+        
+        Compares the centroid of the document embeddings with the one from
+        the previous reflection; a cosine above
+        settings.reflection_convergence_threshold means another search is
+        unlikely to add new information. Never converged on the first
+        reflection or if embedding fails.
+        
+        Args:
+            state: Current agent state
+            
+        Returns:
+            True if further searching should stop
+        """
+        if not state.documents:
+            return False
+        
+        try:
+            vectors = await self._document_vectors(state)
+        except Exception as e:
+            logger.warning("Convergence check skipped: %s", e)
+            return False
+        
+        centroid = await self._offload(self._centroid, vectors)
+        previous, state.prev_centroid = state.prev_centroid, centroid
+        if previous is None:
+            return False
+        
+        similarity = filters.cosine_scores(centroid, [previous])[0]
+        logger.debug("Result centroid similarity to previous iteration: %.3f", similarity)
+        return similarity >= settings.reflection_convergence_threshold
+    
+    async def _rerank_node(self, state: AgentState) -> AgentState:
+        """
+        Node: Keep the top-K documents by embedding similarity to the query.
+        
+        Bounds the synthesis prompt when iterations accumulate many
+        documents. Skipped when there are already K or fewer.
+        
+        Args:
+            state: Current agent state
+            
+        Returns:
+            Updated state with at most settings.synthesis_top_k documents
+        """
+        top_k = settings.synthesis_top_k
+        state.sources_found = len(state.documents)
+        if len(state.documents) <= top_k:
+            return state
+        
+        step_start = time.monotonic_ns()
+        logger.info("Node: Rerank documents")
+        total = len(state.documents)
+        
+        try:
+            if state.query_embedding is None:
+                state.query_embedding = await self._embed_query(state.query)
+            if state.query_embedding is None:
+                raise RuntimeError("query embedding unavailable")
+            
+            doc_vectors = await self._document_vectors(state)
+            scores = await self._offload(
+                filters.cosine_scores,
+                filters.unit_vector(state.query_embedding),
+                doc_vectors
+            )
+            ranked = sorted(
+                zip(scores, state.documents),
+                key=lambda pair: pair[0],
+                reverse=True
+            )
+            state.documents = [doc for _, doc in ranked[:top_k]]
+            status = 'success'
+        
+        except Exception as e:
+            # Fall back to search order, which is already relevance-ranked
+            logger.error("Rerank failed: %s", e)
+            state.errors.append(f"Rerank: {str(e)}")
+            state.documents = state.documents[:top_k]
+            status = 'error'
+        
+        timeline_entry = {
+            'step': 'rerank',
+            'description': f'Kept {len(state.documents)} of {total} documents for synthesis',
+            'details': {'total_documents': total, 'kept': len(state.documents)},
+            'timestamp': step_start,
+            'duration_ms': self._elapsed_ms(step_start),
+            'status': status
+        }
+        self._record_step(state, timeline_entry)
         
         return state
     
@@ -435,21 +1041,28 @@ class ResearchAgent:
         Returns:
             Updated state with answer and citations
         """
-        step_start = time.time()
+        step_start = time.monotonic_ns()
         logger.info("Node: Synthesize answer")
         
+        if state.prefetch_tasks:
+            # Use whatever page text arrived in time; snippets cover the rest
+            _, late = await asyncio.wait(state.prefetch_tasks, timeout=settings.search_timeout)
+            for task in late:
+                task.cancel()
+            state.prefetch_tasks = []
+        
         try:
             # Synthesize answer
             answer, citations = await synthesis.synthesize_answer(
-                query=state['query'],
-                docs=state['documents']
+                query=state.query,
+                docs=state.documents
             )
             
-            state['answer'] = answer
-            state['citations'] = citations
+            state.answer = answer
+            state.citations = citations
             
             # Add to timeline
-            duration_ms = int((time.time() - step_start) * 1000)
+            duration_ms = self._elapsed_ms(step_start)
             timeline_entry = {
                 'step': 'synthesis',
                 'description': f'Synthesized answer with {len(citations)} citations',
@@ -457,29 +1070,19 @@ class ResearchAgent:
                     'answer_length': len(answer),
                     'num_citations': len(citations)
                 },
-                'timestamp': datetime.utcnow(),
+                'timestamp': step_start,
                 'duration_ms': duration_ms,
                 'status': 'success'
             }
-            state['timeline'].append(timeline_entry)
-            
-            # Save to database
-            if state.get('query_id'):
-                await add_timeline_step(
-                    query_id=state['query_id'],
-                    step_name='synthesis',
-                    description=timeline_entry['description'],
-                    details=timeline_entry['details'],
-                    duration_ms=duration_ms
-                )
+            self._record_step(state, timeline_entry)
             
-            logger.info(f"Synthesized answer: {len(answer)} chars, {len(citations)} citations")
+            logger.info("Synthesized answer: %d chars, %d citations", len(answer), len(citations))
         
         except Exception as e:
-            logger.error(f"Synthesis failed: {str(e)}")
-            state['errors'].append(f"Synthesis: {str(e)}")
-            state['answer'] = "I apologize, but I encountered an error while synthesizing the answer."
-            state['citations'] = []
+            logger.error("Synthesis failed: %s", e)
+            state.errors.append(f"Synthesis: {str(e)}")
+            state.answer = "I apologize, but I encountered an error while synthesizing the answer."
+            state.citations = []
         
         return state
     
@@ -493,53 +1096,43 @@ class ResearchAgent:
         Returns:
             Updated state with quality metrics
         """
-        step_start = time.time()
+        step_start = time.monotonic_ns()
         logger.info("Node: Quality check")
         
         try:
             # Check for hallucinations
             if settings.enable_hallucination_check:
                 is_hallucinated, confidence = await filters.check_hallucination(
-                    state['answer'],
-                    state['documents']
+                    state.answer,
+                    state.documents
                 )
-                state['confidence_score'] = confidence
+                state.confidence_score = confidence
                 
                 if is_hallucinated:
-                    logger.warning(f"Hallucination detected (confidence: {confidence:.2f})")
+                    logger.warning("Hallucination detected (confidence: %.2f)", confidence)
             else:
-                state['confidence_score'] = 0.8  # Default
+                state.confidence_score = 0.8  # Default
             
             # Add to timeline
-            duration_ms = int((time.time() - step_start) * 1000)
+            duration_ms = self._elapsed_ms(step_start)
             timeline_entry = {
                 'step': 'quality_check',
-                'description': f'Quality check complete (confidence: {state["confidence_score"]:.2f})',
+                'description': f'Quality check complete (confidence: {state.confidence_score:.2f})',
                 'details': {
-                    'confidence_score': state['confidence_score'],
+                    'confidence_score': state.confidence_score,
                     'hallucination_check': settings.enable_hallucination_check
                 },
-                'timestamp': datetime.utcnow(),
+                'timestamp': step_start,
                 'duration_ms': duration_ms,
                 'status': 'success'
             }
-            state['timeline'].append(timeline_entry)
-            
-            # Save to database
-            if state.get('query_id'):
-                await add_timeline_step(
-                    query_id=state['query_id'],
-                    step_name='quality_check',
-                    description=timeline_entry['description'],
-                    details=timeline_entry['details'],
-                    duration_ms=duration_ms
-                )
+            self._record_step(state, timeline_entry)
             
-            logger.info(f"Quality check complete: confidence={state['confidence_score']:.2f}")
+            logger.info("Quality check complete: confidence=%.2f", state.confidence_score)
         
         except Exception as e:
-            logger.error(f"Quality check failed: {str(e)}")
-            state['errors'].append(f"Quality check: {str(e)}")
-            state['confidence_score'] = 0.5  # Low confidence on error
+            logger.error("Quality check failed: %s", e)
+            state.errors.append(f"Quality check: {str(e)}")
+            state.confidence_score = 0.5  # Low confidence on error
         
         return state
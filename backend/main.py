@@ -13,28 +13,136 @@ Features:
 - OpenAPI documentation
 """
 
+import asyncio
+import hashlib
 import logging
+import time
+import httpx
+import orjson
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, Request, Response
+from fastapi import status as http_status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .routes import research, sms
-from .config import settings
+from .config import settings, configure_logging, stop_logging
+from .langgraph_agent import ResearchAgent
+from .services.llm import close_clients, llm_concurrency_snapshot, warmup_clients
+from .services.search import close_search_client
 from .utils.db import init_db, close_db, db_manager
 from .utils.cache import init_cache, close_cache, cache_manager
+from .utils.metrics import research_metrics
 
-# Configure logging
-logging.basicConfig(
-    level=settings.get_log_level_int(),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Entries buffered by log_requests before the drain task drops them
+REQUEST_LOG_QUEUE_SIZE = 10000
+REQUEST_LOG_BATCH_SIZE = 256
+
+# Seconds a composite health result is reused across pollers
+HEALTH_CACHE_TTL = 1.0
+_last_health: tuple[float, bytes, str] = (0.0, b"", "")
+
+# Seconds clients may reuse the root and status payloads
+STATIC_CACHE_MAX_AGE = 5
+
+OPENAPI_URL = "/openapi.json"
+OPENAPI_CACHE_MAX_AGE = 300
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    Stands in for FastAPI's ORJSONResponse, which is deprecated; routes that
+    return plain dicts and the exception handlers still get orjson's speed.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+async def _drain_request_logs(queue: asyncio.Queue) -> None:
+    """
+    Write request log entries queued by the log_requests middleware.
+    
+    Runs for the application's lifetime, taking entries in batches so the
+    formatting and handler work happens off the request path.
+    
+    Args:
+        queue: Queue of (method, path, status_code, duration_ms, created)
+    """
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < REQUEST_LOG_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        _emit_request_logs(batch)
+
+
+def _emit_request_logs(batch) -> None:
+    """
+    Log a batch of request entries at INFO, keeping their original times.
+    
+    Args:
+        batch: Entries of (method, path, status_code, duration_ms, created)
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    for method, path, status_code, duration_ms, created in batch:
+        record = logger.makeRecord(
+            logger.name, logging.INFO, __file__, 0,
+            "%s %s - Status: %d (%.1f ms)",
+            (method, path, status_code, duration_ms),
+            None
+        )
+        record.created = created
+        logger.handle(record)
+
+
+def _with_etag(body: bytes) -> tuple[bytes, str]:
+    """
+    Pair a JSON body with its weak ETag.
+    
+    Args:
+        body: Serialized response body
+        
+    Returns:
+        Tuple of (body, etag)
+    """
+    return body, f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _cacheable_response(request: Request, body: bytes, etag: str, max_age: int) -> Response:
+    """
+    Serve a JSON body with ETag and Cache-Control, or 304 if the client has it.
+    
+    Args:
+        request: Incoming request (for If-None-Match)
+        body: Serialized response body
+        etag: ETag for body
+        max_age: Seconds clients may cache the response
+        
+    Returns:
+        304 Not Modified when If-None-Match matches, otherwise the body
+    """
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=http_status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -51,19 +159,20 @@ async def lifespan(app: FastAPI):
         Control during application runtime
     """
     # Startup
+    configure_logging()
     logger.info("=" * 60)
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"Environment: {settings.APP_ENV}")
-    logger.info(f"Search Provider: {settings.search_provider}")
+    logger.info("Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
+    logger.info("Environment: %s", settings.APP_ENV)
+    logger.info("Search Provider: %s", settings.search_provider)
     logger.info("=" * 60)
     
     try:
         # Initialize database
         logger.info("Initializing database...")
         await init_db()
-        logger.info("✓ Database initialized")
+        logger.info("✓ Database initialized (%s)", db_manager.pool_status())
     except Exception as e:
-        logger.error(f"✗ Database initialization failed: {str(e)}")
+        logger.error("✗ Database initialization failed: %s", e)
         if settings.is_production:
             raise  # Fail fast in production
         logger.warning("Continuing without database in development mode")
@@ -74,23 +183,49 @@ async def lifespan(app: FastAPI):
         await init_cache()
         logger.info("✓ Cache initialized")
     except Exception as e:
-        logger.error(f"✗ Cache initialization failed: {str(e)}")
+        logger.error("✗ Cache initialization failed: %s", e)
         if settings.is_production:
             raise
         logger.warning("Continuing without cache in development mode")
     
+    # Request logs are queued by the middleware and written in the background
+    app.state.request_log = asyncio.Queue(maxsize=REQUEST_LOG_QUEUE_SIZE)
+    request_log_task = asyncio.create_task(_drain_request_logs(app.state.request_log))
+    
+    # One pooled HTTP/2 client per worker for all outbound calls
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(settings.search_timeout),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+    
+    # One agent per worker, shared by all routes via get_agent()
+    app.state.agent = ResearchAgent(http=app.state.http)
+    await asyncio.gather(app.state.agent.warmup(), warmup_clients())
+    logger.info("✓ Research agent initialized")
+    
+    # Settings are fixed after startup, so static endpoint bodies are
+    # serialized once here
+    app.state.root_payload = _with_etag(orjson.dumps(_root_payload()))
+    app.state.status_payload = _with_etag(orjson.dumps(_status_payload()))
+    if settings.is_development:
+        app.state.debug_config_payload = orjson.dumps(_debug_config_payload())
+    
     # Log feature flags
     logger.info("Feature flags:")
-    logger.info(f"  - SMS: {settings.enable_sms}")
-    logger.info(f"  - Caching: {settings.enable_caching}")
-    logger.info(f"  - Metrics: {settings.enable_metrics}")
-    logger.info(f"  - PII Filter: {settings.enable_pii_filter}")
-    logger.info(f"  - Toxicity Filter: {settings.enable_toxicity_filter}")
+    logger.info("  - SMS: %s", settings.enable_sms)
+    logger.info("  - Caching: %s", settings.enable_caching)
+    logger.info("  - Metrics: %s", settings.enable_metrics)
+    logger.info("  - PII Filter: %s", settings.enable_pii_filter)
+    logger.info("  - Toxicity Filter: %s", settings.enable_toxicity_filter)
+    
+    # All routes are registered by now, so the schema is final
+    app.state.openapi_payload = orjson.dumps(app.openapi())
     
     logger.info("=" * 60)
     logger.info("Application startup complete!")
-    logger.info(f"API available at http://{settings.APP_HOST}:{settings.APP_PORT}")
-    logger.info(f"Docs available at http://{settings.APP_HOST}:{settings.APP_PORT}/docs")
+    logger.info("API available at http://%s:%s", settings.APP_HOST, settings.APP_PORT)
+    logger.info("Docs available at http://%s:%s/docs", settings.APP_HOST, settings.APP_PORT)
     logger.info("=" * 60)
     
     yield  # Application runs here
@@ -105,18 +240,36 @@ async def lifespan(app: FastAPI):
         await close_db()
         logger.info("✓ Database connections closed")
     except Exception as e:
-        logger.error(f"✗ Error closing database: {str(e)}")
+        logger.error("✗ Error closing database: %s", e)
+    
+    request_log_task.cancel()
+    remaining = []
+    while not app.state.request_log.empty():
+        remaining.append(app.state.request_log.get_nowait())
+    _emit_request_logs(remaining)
+    
+    try:
+        logger.info("Closing research agent...")
+        await app.state.agent.close()
+        logger.info("✓ Research agent closed")
+    except Exception as e:
+        logger.error("✗ Error closing research agent: %s", e)
+    
+    await app.state.http.aclose()
+    await close_clients()
+    await close_search_client()
     
     try:
         logger.info("Closing cache connections...")
         await close_cache()
         logger.info("✓ Cache connections closed")
     except Exception as e:
-        logger.error(f"✗ Error closing cache: {str(e)}")
+        logger.error("✗ Error closing cache: %s", e)
     
     logger.info("=" * 60)
     logger.info("Shutdown complete")
     logger.info("=" * 60)
+    stop_logging()
 
 
 # Create FastAPI application
@@ -153,25 +306,108 @@ app = FastAPI(
     """,
     version=settings.APP_VERSION,
     lifespan=lifespan,
-    docs_url="/docs",
-    redoc_url="/redoc",
-    openapi_url="/openapi.json",
+    default_response_class=OrjsonResponse,
+    # Docs routes are registered below so the schema is served from bytes
+    # serialized once at startup
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
 )
 
 
 # ==================== Middleware ====================
 
 # CORS Middleware
+# Browsers reject a wildcard origin with credentials, so only the explicit
+# origin list allows them
+CORS_ORIGINS = ["*"] if settings.is_development else [
+    "http://localhost:3000",
+    "http://localhost:5173",  # Vite default
+    # Add your production frontend URLs here
+]
+CORS_ALLOW_CREDENTIALS = "*" not in CORS_ORIGINS
+CORS_MAX_AGE = 600
+
+
+class PreflightMiddleware:
+    """
+    Answer CORS preflight requests from headers built once at startup.
+    
+    Sits directly in front of CORSMiddleware as a plain ASGI app, inside the
+    log_requests middleware, so preflights are still logged. Preflights from
+    an allowed origin get a static 204 without reaching CORSMiddleware or the
+    router; everything else (including rejected preflights) passes through.
+    
+    Args:
+        app: Wrapped ASGI application
+        allow_origins: Allowed origins, or ["*"]
+        allow_credentials: Whether to send Access-Control-Allow-Credentials
+        max_age: Seconds browsers may cache the preflight result
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: List[str],
+        allow_credentials: bool = False,
+        max_age: int = 600
+    ):
+        self.app = app
+        self.allow_all = "*" in allow_origins
+        self.allow_origins = frozenset(o.encode("latin-1") for o in allow_origins)
+        self.echo_origin = allow_credentials or not self.allow_all
+        
+        self.headers = [
+            (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"content-length", b"0"),
+        ]
+        if allow_credentials:
+            self.headers.append((b"access-control-allow-credentials", b"true"))
+        if self.echo_origin:
+            self.headers.append((b"vary", b"Origin"))
+        else:
+            self.headers.append((b"access-control-allow-origin", b"*"))
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        request_headers = dict(scope["headers"])
+        origin = request_headers.get(b"origin")
+        if (
+            origin is None
+            or b"access-control-request-method" not in request_headers
+            or not (self.allow_all or origin in self.allow_origins)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        headers = list(self.headers)
+        if self.echo_origin:
+            headers.append((b"access-control-allow-origin", origin))
+        requested_headers = request_headers.get(b"access-control-request-headers")
+        if requested_headers:
+            headers.append((b"access-control-allow-headers", requested_headers))
+        
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"] if settings.is_development else [
-        "http://localhost:3000",
-        "http://localhost:5173",  # Vite default
-        # Add your production frontend URLs here
-    ],
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=CORS_ALLOW_CREDENTIALS,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=CORS_MAX_AGE,
+)
+app.add_middleware(
+    PreflightMiddleware,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=CORS_ALLOW_CREDENTIALS,
+    max_age=CORS_MAX_AGE,
 )
 
 
@@ -181,6 +417,10 @@ async def log_requests(request: Request, call_next):
     """
     Log all incoming requests.
     
+    Only enqueues a tuple per request; the lifespan's drain task formats
+    and writes it. Nothing is queued when INFO is disabled, and entries are
+    dropped when the queue is full.
+    
     Args:
         request: Incoming request
         call_next: Next middleware in chain
@@ -188,14 +428,23 @@ async def log_requests(request: Request, call_next):
     Returns:
         Response from next middleware
     """
-    # Log request
-    logger.info(f"{request.method} {request.url.path}")
+    start = time.perf_counter()
     
     # Process request
     response = await call_next(request)
     
-    # Log response
-    logger.info(f"{request.method} {request.url.path} - Status: {response.status_code}")
+    queue = getattr(request.app.state, "request_log", None)
+    if queue is not None and logger.isEnabledFor(logging.INFO):
+        try:
+            queue.put_nowait((
+                request.method,
+                request.url.path,
+                response.status_code,
+                (time.perf_counter() - start) * 1000,
+                time.time()
+            ))
+        except asyncio.QueueFull:
+            pass  # Shed logging under overload rather than block requests
     
     return response
 
@@ -214,15 +463,16 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     Returns:
         JSON error response
     """
-    logger.error(f"HTTP {exc.status_code}: {exc.detail} - {request.url.path}")
+    path = request.url.path
+    logger.error("HTTP %d: %s - %s", exc.status_code, exc.detail, path)
     
-    return JSONResponse(
+    return OrjsonResponse(
         status_code=exc.status_code,
         content={
             "error": {
                 "status_code": exc.status_code,
                 "message": exc.detail,
-                "path": str(request.url.path)
+                "path": path
             }
         }
     )
@@ -240,16 +490,20 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     Returns:
         JSON error response with validation details
     """
-    logger.error(f"Validation error: {exc.errors()} - {request.url.path}")
-    
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    path = request.url.path
+    # Encoded once for both the log and the body; validator errors carry
+    # exception objects in ctx that orjson cannot serialize as-is
+    errors = jsonable_encoder(exc.errors())
+    logger.error("Validation error: %s - %s", errors, path)
+    
+    return OrjsonResponse(
+        status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": {
                 "status_code": 422,
                 "message": "Validation error",
-                "details": exc.errors(),
-                "path": str(request.url.path)
+                "details": errors,
+                "path": path
             }
         }
     )
@@ -267,7 +521,8 @@ async def general_exception_handler(request: Request, exc: Exception):
     Returns:
         JSON error response
     """
-    logger.error(f"Unhandled exception: {str(exc)} - {request.url.path}", exc_info=True)
+    path = request.url.path
+    logger.error("Unhandled exception: %s - %s", exc, path, exc_info=True)
     
     # Don't expose internal errors in production
     if settings.is_production:
@@ -275,13 +530,13 @@ async def general_exception_handler(request: Request, exc: Exception):
     else:
         message = str(exc)
     
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    return OrjsonResponse(
+        status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": {
                 "status_code": 500,
                 "message": message,
-                "path": str(request.url.path)
+                "path": path
             }
         }
     )
@@ -302,10 +557,23 @@ app.include_router(sms.router, tags=["SMS"])
     description="Returns basic API information",
     tags=["Info"]
 )
-async def root():
+async def root(request: Request):
     """
     Root endpoint returning API information.
     
+    Args:
+        request: Incoming request (to reach the precomputed payload)
+    
+    Returns:
+        API metadata
+    """
+    return _cacheable_response(request, *request.app.state.root_payload, STATIC_CACHE_MAX_AGE)
+
+
+def _root_payload() -> Dict[str, Any]:
+    """
+    Build the root endpoint body.
+    
     Returns:
         API metadata
     """
@@ -325,19 +593,34 @@ async def root():
     tags=["Health"],
     response_model=Dict[str, Any]
 )
-async def health_check():
+async def health_check(request: Request):
     """
     Comprehensive health check for all services.
     
     Checks:
     - API status
+    - Research agent initialization
     - Database connectivity
     - Cache connectivity
     - Search provider configuration
     
+    The result is reused for HEALTH_CACHE_TTL seconds so frequent
+    load-balancer polling does not ping the database and Redis each time,
+    and is sent with a matching max-age and an ETag for conditional polls.
+    
+    Args:
+        request: Incoming request (to reach the app's agent)
+    
     Returns:
         Health status for all components
     """
+    global _last_health
+    
+    max_age = int(HEALTH_CACHE_TTL)
+    checked_at, body, etag = _last_health
+    if body and time.monotonic() - checked_at < HEALTH_CACHE_TTL:
+        return _cacheable_response(request, body, etag, max_age)
+    
     health_status = {
         "status": "healthy",
         "service": settings.APP_NAME,
@@ -346,23 +629,23 @@ async def health_check():
         "components": {}
     }
     
-    # Check database
-    try:
-        db_healthy = await db_manager.health_check()
-        health_status["components"]["database"] = "healthy" if db_healthy else "unhealthy"
-    except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
-        health_status["components"]["database"] = "unhealthy"
-        health_status["status"] = "degraded"
+    agent = getattr(request.app.state, "agent", None)
+    health_status["components"]["agent"] = "healthy" if agent else "unavailable"
     
-    # Check cache
-    try:
-        cache_healthy = await cache_manager.health_check()
-        health_status["components"]["cache"] = "healthy" if cache_healthy else "unhealthy"
-    except Exception as e:
-        logger.error(f"Cache health check failed: {str(e)}")
-        health_status["components"]["cache"] = "unhealthy"
-        health_status["status"] = "degraded"
+    # Check database and cache concurrently
+    db_healthy, cache_healthy = await asyncio.gather(
+        db_manager.health_check(),
+        cache_manager.health_check(),
+        return_exceptions=True
+    )
+    
+    for component, healthy in (("database", db_healthy), ("cache", cache_healthy)):
+        if isinstance(healthy, BaseException):
+            logger.error("%s health check failed: %s", component.capitalize(), healthy)
+            health_status["components"][component] = "unhealthy"
+            health_status["status"] = "degraded"
+        else:
+            health_status["components"][component] = "healthy" if healthy else "unhealthy"
     
     # Check search provider
     health_status["components"]["search_provider"] = {
@@ -379,7 +662,9 @@ async def health_check():
     if health_status["components"]["database"] == "unhealthy":
         health_status["status"] = "unhealthy"
     
-    return health_status
+    body, etag = _with_etag(orjson.dumps(health_status))
+    _last_health = (time.monotonic(), body, etag)
+    return _cacheable_response(request, body, etag, max_age)
 
 
 @app.get(
@@ -388,10 +673,23 @@ async def health_check():
     description="Get detailed application status and configuration",
     tags=["Health"]
 )
-async def status():
+async def status(request: Request):
     """
     Detailed application status and configuration.
     
+    Args:
+        request: Incoming request (to reach the precomputed payload)
+    
+    Returns:
+        Comprehensive status information
+    """
+    return _cacheable_response(request, *request.app.state.status_payload, STATIC_CACHE_MAX_AGE)
+
+
+def _status_payload() -> Dict[str, Any]:
+    """
+    Build the status endpoint body.
+    
     Returns:
         Comprehensive status information
     """
@@ -434,19 +732,55 @@ async def metrics():
     """
     Basic application metrics.
     
+    Research counters are aggregated in memory by the research route and
+    read here as a snapshot, together with this worker's Gemini request
+    concurrency.
+    
     Returns:
         Application metrics if enabled
     """
     if not settings.enable_metrics:
         return {"error": "Metrics not enabled"}
     
-    # TODO: Implement proper metrics collection (Prometheus, etc.)
     return {
         "enabled": True,
-        "note": "Detailed metrics implementation pending"
+        **research_metrics.snapshot(),
+        **llm_concurrency_snapshot()
     }
 
 
+# ==================== API Docs ====================
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_schema(request: Request):
+    """
+    Serve the OpenAPI schema serialized at startup.
+    
+    Args:
+        request: Incoming request (to reach the precomputed payload)
+    
+    Returns:
+        OpenAPI schema JSON
+    """
+    return Response(
+        request.app.state.openapi_payload,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={OPENAPI_CACHE_MAX_AGE}"}
+    )
+
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui():
+    """Swagger UI backed by the cached schema."""
+    return get_swagger_ui_html(openapi_url=OPENAPI_URL, title=f"{settings.APP_NAME} - Swagger UI")
+
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc():
+    """ReDoc backed by the cached schema."""
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{settings.APP_NAME} - ReDoc")
+
+
 # ==================== Development Endpoints ====================
 
 if settings.is_development:
@@ -457,61 +791,85 @@ if settings.is_development:
         tags=["Debug"],
         include_in_schema=settings.is_development
     )
-    async def debug_config():
+    async def debug_config(request: Request):
         """
         Debug endpoint to view configuration.
         
         Only available in development mode.
         
+        Args:
+            request: Incoming request (to reach the precomputed payload)
+        
         Returns:
             Sanitized configuration
         """
-        return {
-            "app": {
-                "name": settings.APP_NAME,
-                "version": settings.APP_VERSION,
-                "env": settings.APP_ENV,
-                "host": settings.APP_HOST,
-                "port": settings.APP_PORT,
-                "log_level": settings.LOG_LEVEL
-            },
-            "database": {
-                "host": settings.POSTGRES_HOST,
-                "port": settings.POSTGRES_PORT,
-                "db": settings.POSTGRES_DB,
-                "user": settings.POSTGRES_USER
-            },
-            "cache": {
-                "url": settings.REDIS_URL
-            },
-            "search": {
-                "provider": settings.search_provider,
-                "api_key_set": bool(settings.search_api_key)
-            },
-            "llm": {
-                "model": settings.llm_model,
-                "temperature": settings.llm_temperature,
-                "max_tokens": settings.max_tokens
-            },
-            "features": {
-                "sms": settings.enable_sms,
-                "caching": settings.enable_caching,
-                "metrics": settings.enable_metrics
-            }
+        return Response(
+            request.app.state.debug_config_payload,
+            media_type="application/json"
+        )
+
+
+def _debug_config_payload() -> Dict[str, Any]:
+    """
+    Build the debug config endpoint body.
+    
+    Returns:
+        Sanitized configuration
+    """
+    return {
+        "app": {
+            "name": settings.APP_NAME,
+            "version": settings.APP_VERSION,
+            "env": settings.APP_ENV,
+            "host": settings.APP_HOST,
+            "port": settings.APP_PORT,
+            "log_level": settings.LOG_LEVEL
+        },
+        "database": {
+            "host": settings.POSTGRES_HOST,
+            "port": settings.POSTGRES_PORT,
+            "db": settings.POSTGRES_DB,
+            "user": settings.POSTGRES_USER
+        },
+        "cache": {
+            "url": settings.REDIS_URL
+        },
+        "search": {
+            "provider": settings.search_provider,
+            "api_key_set": bool(settings.search_api_key)
+        },
+        "llm": {
+            "model": settings.llm_model,
+            "temperature": settings.llm_temperature,
+            "max_tokens": settings.max_tokens
+        },
+        "features": {
+            "sms": settings.enable_sms,
+            "caching": settings.enable_caching,
+            "metrics": settings.enable_metrics
         }
+    }
 
 
 # ==================== Application Entry Point ====================
 
 if __name__ == "__main__":
+    import os
     import uvicorn
     
-    logger.info(f"Starting server on {settings.APP_HOST}:{settings.APP_PORT}")
+    configure_logging()
+    logger.info("Starting server on %s:%s", settings.APP_HOST, settings.APP_PORT)
     
+    # uvloop/httptools ship with uvicorn[standard]; request logging is done
+    # by the app's own middleware, so uvicorn's access log is off
     uvicorn.run(
         "backend.main:app",
         host=settings.APP_HOST,
         port=settings.APP_PORT,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
         reload=settings.is_development,
+        workers=None if settings.is_development else os.cpu_count(),
         log_level=settings.LOG_LEVEL
     )
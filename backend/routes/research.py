@@ -5,18 +5,27 @@ This module provides the main research endpoint for the conversational agent.
 It accepts user queries, orchestrates the LangGraph research workflow, and returns
 synthesized answers with citations and timeline steps.
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks, status
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, List
+from datetime import datetime
+from pydantic import ValidationError
+import asyncio
 import logging
 
+import orjson
+
 from ..schemas import ResearchRequest, ResearchResponse, Citation, TimelineStep
+from ..dependencies import get_agent
 from ..langgraph_agent import ResearchAgent
-from ..config import settings
+from ..config import Settings, get_settings
+from ..utils.metrics import research_metrics
 from ..utils.filters import (
-    check_prompt_injection,
-    check_pii,
-    check_toxicity,
-    sanitize_output
+    QueryVerdict,
+    analyze_query,
+    sanitize_output,
+    sanitize_output_batch
 )
 
 # Configure logger
@@ -33,13 +42,11 @@ router = APIRouter(
     }
 )
 
-# Initialize agent (singleton pattern - consider dependency injection for production)
-agent = ResearchAgent()
-
 
 @router.post(
     "/research",
-    response_model=ResearchResponse,
+    response_model=None,
+    responses={200: {"model": ResearchResponse}},
     status_code=status.HTTP_200_OK,
     summary="Run research query",
     description="""
@@ -66,14 +73,19 @@ agent = ResearchAgent()
 )
 async def run_research(
     req: ResearchRequest,
-    background_tasks: BackgroundTasks
-) -> ResearchResponse:
+    agent: ResearchAgent = Depends(get_agent),
+    settings: Settings = Depends(get_settings)
+) -> Response:
     """
     Run a research query and return synthesized results.
     
+    Repeated questions are answered from the agent's response cache. The
+    response is serialized once by pydantic-core.
+    
     Args:
         req: ResearchRequest containing the query and optional parameters
-        background_tasks: FastAPI background tasks for async operations
+        agent: Shared research agent (injected)
+        settings: Application settings (injected)
         
     Returns:
         ResearchResponse with answer, citations, and timeline
@@ -93,65 +105,11 @@ async def run_research(
         }
         ```
     """
-    # Validate query presence and length
-    if not req.query or len(req.query.strip()) == 0:
-        logger.warning("Empty query received")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Query is required and cannot be empty"
-        )
-    
-    if len(req.query) > 1000:
-        logger.warning(f"Query too long: {len(req.query)} characters")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Query exceeds maximum length of 1000 characters"
-        )
-    
-    # Security checks
-    try:
-        # Check for prompt injection attempts
-        if settings.enable_prompt_injection_check:
-            injection_detected = await check_prompt_injection(req.query)
-            if injection_detected:
-                logger.warning(f"Prompt injection detected in query: {req.query[:50]}...")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Query contains potentially malicious content"
-                )
-        
-        # Check for PII in query
-        if settings.enable_pii_filter:
-            pii_detected = await check_pii(req.query)
-            if pii_detected:
-                logger.warning("PII detected in query")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Query contains personally identifiable information. Please remove sensitive data."
-                )
-        
-        # Check for toxic content
-        if settings.enable_toxicity_filter:
-            is_toxic = await check_toxicity(req.query)
-            if is_toxic:
-                logger.warning("Toxic content detected in query")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Query contains inappropriate or harmful content"
-                )
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error during security checks: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to validate query"
-        )
+    await _validate_query(req, settings)
     
     # Execute research agent
     try:
-        logger.info(f"Starting research for query: {req.query[:50]}... (source: {req.source})")
+        logger.info("Starting research for query: %s... (source: %s)", req.query[:50], req.source)
         
         # Run agent synchronously for MVP
         # TODO: For production, implement async job queue with job IDs
@@ -162,106 +120,235 @@ async def run_research(
         )
         
         # Sanitize output (remove any PII that might have been scraped)
-        if settings.enable_pii_filter:
-            result['answer'] = await sanitize_output(result['answer'])
-            for citation in result.get('citations', []):
-                if 'snippet' in citation:
-                    citation['snippet'] = await sanitize_output(citation['snippet'])
+        await _sanitize_result(result, settings)
         
-        logger.info(f"Research completed successfully with {len(result.get('citations', []))} citations")
+        logger.info("Research completed successfully with %d citations", len(result.get('citations', [])))
         
-        # Log to analytics/monitoring in background
-        background_tasks.add_task(
-            log_research_metrics,
-            query=req.query,
+        research_metrics.record(
             source=req.source,
             num_citations=len(result.get('citations', [])),
             num_steps=len(result.get('timeline', []))
         )
         
-        return ResearchResponse(**result)
+        response = _build_response(result)
+        return Response(content=response.model_dump_json(), media_type="application/json")
     
     except ValueError as e:
-        logger.error(f"Invalid agent response: {str(e)}")
+        logger.error("Invalid agent response: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Agent returned invalid response: {str(e)}"
         )
     
     except ConnectionError as e:
-        logger.error(f"External API connection failed: {str(e)}")
+        logger.error("External API connection failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="External services are temporarily unavailable. Please try again later."
         )
     
     except Exception as e:
-        logger.error(f"Unexpected error during research: {str(e)}", exc_info=True)
+        logger.error("Unexpected error during research: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while processing your request"
         )
 
 
-async def log_research_metrics(
-    query: str,
-    source: str,
-    num_citations: int,
-    num_steps: int
-) -> None:
+def _build_response(result: Dict[str, Any]) -> ResearchResponse:
     """
-    Log research metrics for monitoring and analytics.
+    Wrap an agent result in a ResearchResponse without re-validating it.
     
-    This is a background task that logs metrics without blocking the response.
+    The agent builds its result from typed internal data, so validation is
+    skipped except for citations, whose URLs come from search providers.
+    Results replayed from the semantic cache went through JSON and are
+    validated normally so their timestamps are parsed back.
     
     Args:
-        query: The research query
-        source: Source of the query (web_ui, sms, api)
-        num_citations: Number of citations in the response
-        num_steps: Number of timeline steps executed
+        result: Sanitized agent response dictionary
+        
+    Returns:
+        Response model for the result
     """
-    try:
-        # TODO: Implement actual metrics logging (Prometheus, DataDog, etc.)
-        logger.info(
-            f"Metrics - Query: {query[:30]}..., Source: {source}, "
-            f"Citations: {num_citations}, Steps: {num_steps}"
-        )
-    except Exception as e:
-        logger.error(f"Failed to log metrics: {str(e)}")
+    if (result.get('metadata') or {}).get('cache_hit'):
+        return ResearchResponse(**result)
+    
+    # Every citation in a run is stamped with the run's completion time
+    # rather than a datetime.utcnow() call per citation
+    accessed_at = result.get('completed_at') or datetime.utcnow()
+    raw_citations = result.get('citations', [])
+    citations = _validate_citations(raw_citations, accessed_at)
+    metadata = result.get('metadata')
+    if len(citations) < len(raw_citations):
+        metadata = {**(metadata or {}), 'citations_dropped': len(raw_citations) - len(citations)}
+    
+    return ResearchResponse.model_construct(**{
+        **result,
+        'citations': citations,
+        'metadata': metadata,
+        'timeline': [TimelineStep.model_construct(**t) for t in result.get('timeline', [])]
+    })
 
 
-@router.get(
-    "/health",
-    tags=["health"],
-    summary="Health check endpoint",
-    description="Check if the research API is operational and can reach dependencies"
-)
-async def health_check() -> Dict[str, Any]:
+def _validate_citations(citations: List[Dict[str, Any]], accessed_at: datetime) -> List[Citation]:
     """
-    Health check endpoint for monitoring and load balancers.
+    Validate raw citations, dropping any without a usable http(s) URL.
     
+    Args:
+        citations: Citation dictionaries from the agent
+        accessed_at: Timestamp for citations that don't carry their own
+        
     Returns:
-        Dictionary with health status and component checks
+        Validated Citation models
     """
-    health_status = {
-        "status": "healthy",
-        "service": "research-api",
-        "components": {}
-    }
+    validated = []
+    for citation in citations:
+        try:
+            validated.append(Citation.model_validate({'accessed_at': accessed_at, **citation}))
+        except ValidationError:
+            logger.warning("Dropping invalid citation: %r", citation.get('url'))
+    return validated
+
+
+# (verdict flag, name of the setting enabling it, log message, client
+# detail) in the order failures are reported
+_SECURITY_CHECKS = (
+    (
+        QueryVerdict.PROMPT_INJECTION,
+        "enable_prompt_injection_check",
+        "Prompt injection detected in query",
+        "Query contains potentially malicious content"
+    ),
+    (
+        QueryVerdict.PII,
+        "enable_pii_filter",
+        "PII detected in query",
+        "Query contains personally identifiable information. Please remove sensitive data."
+    ),
+    (
+        QueryVerdict.TOXIC,
+        "enable_toxicity_filter",
+        "Toxic content detected in query",
+        "Query contains inappropriate or harmful content"
+    ),
+)
+
+
+async def _validate_query(req: ResearchRequest, settings: Settings) -> None:
+    """
+    Validate a research request and run the configured security checks.
+    
+    Args:
+        req: Incoming research request
+        settings: Application settings
+        
+    Raises:
+        HTTPException: 400 if the query is invalid or fails a security check
+        HTTPException: 500 if the checks themselves fail
+    """
+    # Validate query presence and length
+    if not req.query or len(req.query.strip()) == 0:
+        logger.warning("Empty query received")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Query is required and cannot be empty"
+        )
+    
+    if len(req.query) > 1000:
+        logger.warning("Query too long: %d characters", len(req.query))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Query exceeds maximum length of 1000 characters"
+        )
+    
+    # All enabled security checks run in one fused pass
+    checks = QueryVerdict.CLEAN
+    for flag, setting, _, _ in _SECURITY_CHECKS:
+        if getattr(settings, setting):
+            checks |= flag
     
     try:
-        # Check agent initialization
-        health_status["components"]["agent"] = "healthy" if agent else "unavailable"
+        verdict = await analyze_query(req.query, checks)
+    except Exception as e:
+        logger.error("Error during security checks: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to validate query"
+        )
+    
+    for flag, _, message, detail in _SECURITY_CHECKS:
+        if verdict & flag:
+            logger.warning(message)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=detail
+            )
+
+
+async def _sanitize_result(result: Dict[str, Any], settings: Settings) -> None:
+    """
+    Redact PII from the answer and citation snippets in place.
+    
+    Args:
+        result: Agent response dictionary
+        settings: Application settings
+    """
+    if settings.enable_pii_filter:
+        citations = [c for c in result.get('citations', []) if 'snippet' in c]
+        answer, snippets = await asyncio.gather(
+            sanitize_output(result['answer']),
+            sanitize_output_batch([c['snippet'] for c in citations])
+        )
+        result['answer'] = answer
+        for citation, snippet in zip(citations, snippets):
+            citation['snippet'] = snippet
+
+
+@router.post(
+    "/research/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Stream research query progress",
+    description="""
+    Execute a research query and stream progress as newline-delimited JSON.
+    
+    Each line is an event object:
+    - `{"type": "step", "data": {...}}` as each agent step completes
+    - `{"type": "answer", "data": {...}}` with the final research response
+    
+    The same validation and safety checks as `/api/research` apply.
+    """,
+    response_class=StreamingResponse,
+    response_description="NDJSON stream of agent steps followed by the answer"
+)
+async def stream_research(
+    req: ResearchRequest,
+    agent: ResearchAgent = Depends(get_agent),
+    settings: Settings = Depends(get_settings)
+) -> StreamingResponse:
+    """
+    Run a research query, streaming timeline steps as they happen.
+    
+    Args:
+        req: ResearchRequest containing the query and optional parameters
+        agent: Shared research agent (injected)
+        settings: Application settings (injected)
         
-        # TODO: Add checks for:
-        # - Database connection
-        # - Redis connection
-        # - External API availability (Gemini, search)
+    Returns:
+        StreamingResponse emitting one JSON event per line
         
-        return health_status
+    Raises:
+        HTTPException: 400 if query is invalid or contains security issues
+    """
+    await _validate_query(req, settings)
     
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        health_status["status"] = "unhealthy"
-        health_status["error"] = str(e)
-        return health_status
+    async def events() -> AsyncIterator[bytes]:
+        async for event in agent.stream(
+            query=req.query,
+            source=req.source,
+            max_iterations=req.max_iterations
+        ):
+            if event['type'] == 'answer':
+                await _sanitize_result(event['data'], settings)
+            yield orjson.dumps(event, default=jsonable_encoder, option=orjson.OPT_APPEND_NEWLINE)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -5,17 +5,27 @@ This module handles inbound SMS queries from Africa's Talking webhook
 and sends research results back via SMS. It provides a conversational
 interface for users to access the research agent via text messages.
 """
-from fastapi import APIRouter, Form, BackgroundTasks, HTTPException, status, Request
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.types import Message
+from typing import Any, Callable, Coroutine, Dict, Optional, Set, Tuple
+import asyncio
 import logging
 import hashlib
 import hmac
+import time
+import weakref
+from functools import lru_cache
+from urllib.parse import unquote_to_bytes
 
 from ..schemas import ResearchResponse, SMSInboundRequest, SMSResponse
+from ..dependencies import get_agent
 from ..langgraph_agent import ResearchAgent
 from ..services.llm import send_sms_reply
-from ..config import settings
-from ..utils.filters import check_pii, check_toxicity, sanitize_output
+from ..config import Settings, get_settings, settings
+from ..utils.cache import normalize_query
+from ..utils.filters import QueryVerdict, analyze_query, sanitize_output
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -32,11 +42,192 @@ router = APIRouter(
     }
 )
 
-# Initialize agent
-agent = ResearchAgent()
+# Webhook bodies are a handful of short form fields; larger ones are refused.
+# A full 500-character message percent-encodes to at most 6000 bytes.
+MAX_WEBHOOK_BODY_BYTES = 8192
+SMS_MAX_CHARS = 500
 
+# Seconds to spend trying to tell a user their research failed
+FAILURE_NOTICE_TIMEOUT = 5.0
 
-@router.post(
+# Completed SMS results are reused for this many seconds, so retried or
+# resent questions are answered without another agent run
+SMS_RESULT_TTL = 60.0
+SMS_RESULT_CACHE_SIZE = 1024
+
+# Appended to replies cut down to fit the SMS length limit
+SMS_TRUNCATION_SUFFIX = "... (truncated)\n\nFor full results, visit our web app."
+
+# Citations listed in an SMS reply, and the length their URLs are cut to
+SMS_MAX_CITATIONS = 3
+SMS_MAX_URL_LENGTH = 40
+
+# Caps on concurrent agent runs, so a flood of messages (or one spamming
+# sender) queues instead of exhausting LLM quota. Per-sender semaphores are
+# held weakly and disappear once no run for that sender is pending. Like
+# other pool sizes these are read from settings once, at import.
+_research_slots = asyncio.Semaphore(settings.max_concurrent_sms_research)
+_sender_slots: "weakref.WeakValueDictionary[str, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+
+# Dedup keys of SMS research runs in progress
+_sms_inflight: Set[str] = set()
+
+# Dedup key -> (monotonic time stored, agent result), oldest first
+_recent_results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+# Strong references to running ack/research tasks; the event loop only keeps
+# weak ones, so unreferenced tasks could be garbage-collected mid-flight
+_live_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn(coro: Coroutine, name: str) -> asyncio.Task:
+    """
+    Start a coroutine as a tracked background task.
+    
+    Args:
+        coro: Coroutine to run
+        name: Task name (shows up in debugging and task dumps)
+        
+    Returns:
+        The started task
+    """
+    task = asyncio.create_task(coro, name=name)
+    _live_tasks.add(task)
+    task.add_done_callback(_live_tasks.discard)
+    return task
+
+
+class SignedWebhookRoute(APIRoute):
+    """
+    Route that checks the Africa's Talking signature before parsing the body.
+    
+    FastAPI reads form fields before the endpoint (or any dependency) runs,
+    so the body is read here first, capped at MAX_WEBHOOK_BODY_BYTES whether
+    or not a Content-Length was sent, and its signature verified. The
+    endpoint then receives a request that replays the buffered body.
+    """
+    
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        
+        async def signed_handler(request: Request) -> Response:
+            _check_body_size(int(request.headers.get("content-length") or 0))
+            body = await _read_capped_body(request)
+            secret = get_settings().africas_talking_webhook_secret
+            if secret:
+                try:
+                    verify_webhook_signature(request, body, secret)
+                except ValueError as e:
+                    logger.warning(f"Invalid webhook signature: {e}")
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Invalid webhook signature"
+                    )
+            return await handler(_replay_request(request, body))
+        
+        return signed_handler
+
+
+async def _read_capped_body(request: Request) -> bytes:
+    """
+    Read the request body, refusing it as soon as it passes the size cap.
+    
+    Args:
+        request: Incoming webhook request
+        
+    Returns:
+        The complete body
+        
+    Raises:
+        HTTPException: 413 once more than MAX_WEBHOOK_BODY_BYTES have arrived
+    """
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        _check_body_size(len(body))
+    return bytes(body)
+
+
+def _replay_request(request: Request, body: bytes) -> Request:
+    """
+    Build a request that yields an already-read body to its readers.
+    
+    Args:
+        request: Request whose body stream has been consumed
+        body: The body read from it
+        
+    Returns:
+        Request over the same scope; later receives (disconnect checks) go
+        to the original channel
+    """
+    sent = False
+    
+    async def receive() -> Message:
+        nonlocal sent
+        if sent:
+            return await request.receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+    
+    return Request(request.scope, receive)
+
+
+# Webhook endpoints, verified by SignedWebhookRoute; merged into router below
+webhook_router = APIRouter(route_class=SignedWebhookRoute)
+
+# Form fields Africa's Talking always sends
+_REQUIRED_SMS_FIELDS = ("from", "to", "text")
+
+
+def _check_body_size(size: int) -> None:
+    """
+    Refuse webhook bodies over MAX_WEBHOOK_BODY_BYTES.
+    
+    Args:
+        size: Declared or actual body size in bytes
+        
+    Raises:
+        HTTPException: 413 if the body is too large
+    """
+    if size > MAX_WEBHOOK_BODY_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Webhook body exceeds {MAX_WEBHOOK_BODY_BYTES} bytes"
+        )
+
+
+def _parse_webhook_form(body: bytes) -> Dict[str, bytes]:
+    """
+    Parse an application/x-www-form-urlencoded webhook body.
+    
+    Values stay undecoded so the message text can be checked as bytes.
+    
+    Args:
+        body: Raw request body
+        
+    Returns:
+        Field name to raw value mapping (last value wins for repeated fields)
+        
+    Raises:
+        RequestValidationError: If a required field is missing
+    """
+    fields = {}
+    for pair in body.split(b"&"):
+        if not pair:
+            continue
+        name, _, value = pair.partition(b"=")
+        name = unquote_to_bytes(name.replace(b"+", b" ")).decode("utf-8", errors="replace")
+        fields[name] = unquote_to_bytes(value.replace(b"+", b" "))
+    missing = [name for name in _REQUIRED_SMS_FIELDS if name not in fields]
+    if missing:
+        raise RequestValidationError([
+            {"type": "missing", "loc": ("body", name), "msg": "Field required", "input": None}
+            for name in missing
+        ])
+    return fields
+
+
+@webhook_router.post(
     "/inbound",
     response_model=SMSResponse,
     status_code=status.HTTP_200_OK,
@@ -46,7 +237,7 @@ agent = ResearchAgent()
     
     This endpoint:
     1. Receives inbound SMS messages
-    2. Validates the webhook signature (if configured)
+    2. Validates the webhook signature (if configured, before parsing)
     3. Performs research using the LangGraph agent
     4. Sends a truncated, SMS-friendly reply back to the user
     
@@ -59,37 +250,42 @@ agent = ResearchAgent()
     - Applied per phone number to prevent abuse
     - Configurable in settings
     """,
-    response_description="SMS processing status"
+    response_description="SMS processing status",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-www-form-urlencoded": {
+                    "schema": SMSInboundRequest.model_json_schema(by_alias=True)
+                }
+            }
+        }
+    }
 )
 async def inbound_sms(
     request: Request,
-    background_tasks: BackgroundTasks,
-    from_number: str = Form(..., alias="from", description="Sender's phone number"),
-    to: str = Form(..., description="Destination number (your shortcode/number)"),
-    text: str = Form(..., description="SMS message text"),
-    date: Optional[str] = Form(None, description="Message timestamp"),
-    id: Optional[str] = Form(None, description="Message ID from Africa's Talking"),
-    linkId: Optional[str] = Form(None, description="Link ID for message threading"),
-    networkCode: Optional[str] = Form(None, description="Network operator code")
+    agent: ResearchAgent = Depends(get_agent),
+    settings: Settings = Depends(get_settings)
 ) -> SMSResponse:
     """
     Handle inbound SMS webhook from Africa's Talking.
     
+    The url-encoded body is read once (SignedWebhookRoute has already
+    buffered it when verifying the signature) and parsed by
+    _parse_webhook_form, skipping Starlette's form parser. Fields are those of SMSInboundRequest:
+    from, to, text, date, id, linkId and networkCode.
+    
     Args:
-        request: FastAPI request object (for signature verification)
-        background_tasks: Background tasks queue
-        from_number: Sender's phone number (E.164 format)
-        to: Recipient number (your service number)
-        text: SMS message content
-        date: Message timestamp
-        id: Unique message ID
-        linkId: Thread/conversation ID
-        networkCode: Mobile network operator code
+        request: Incoming webhook request
+        agent: Shared research agent (injected)
+        settings: Application settings (injected)
         
     Returns:
         SMSResponse with processing status
         
     Raises:
+        RequestValidationError: 422 if from, to or text is missing
+        HTTPException: 413 if the body exceeds MAX_WEBHOOK_BODY_BYTES
         HTTPException: 400 if message is invalid
         HTTPException: 401 if webhook signature is invalid
         HTTPException: 500 if processing fails
@@ -106,23 +302,21 @@ async def inbound_sms(
         networkCode=63902
         ```
     """
+    # Already read and size-checked by SignedWebhookRoute
+    body = await request.body()
+    
+    fields = _parse_webhook_form(body)
+    from_number = fields["from"].decode("utf-8", errors="replace")
+    raw_text = fields["text"]
+    id = fields["id"].decode("utf-8", errors="replace") if "id" in fields else None
+    linkId = fields["linkId"].decode("utf-8", errors="replace") if "linkId" in fields else None
+    
     # Log inbound message (redact phone number for privacy)
-    redacted_number = f"{from_number[:6]}***{from_number[-3:]}" if len(from_number) > 9 else "***"
-    logger.info(f"Inbound SMS from {redacted_number}: {text[:50]}...")
-    
-    # Verify webhook signature if configured
-    if settings.africas_talking_webhook_secret:
-        try:
-            await verify_webhook_signature(request, settings.africas_talking_webhook_secret)
-        except ValueError as e:
-            logger.warning(f"Invalid webhook signature from {redacted_number}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid webhook signature"
-            )
+    redacted_number = _redact(from_number)
+    logger.info(f"Inbound SMS from {redacted_number}: {raw_text[:50].decode('utf-8', errors='replace')}...")
     
-    # Validate message content
-    if not text or len(text.strip()) == 0:
+    # Validate message content on the raw bytes before decoding it
+    if not raw_text.strip():
         logger.warning(f"Empty SMS received from {redacted_number}")
         await send_sms_reply(
             to=from_number,
@@ -134,8 +328,11 @@ async def inbound_sms(
             to=from_number
         )
     
-    if len(text) > 500:
-        logger.warning(f"SMS too long from {redacted_number}: {len(text)} chars")
+    # A character is at most 4 UTF-8 bytes, so longer payloads are rejected
+    # without decoding
+    text = raw_text.decode("utf-8", errors="replace") if len(raw_text) <= 4 * SMS_MAX_CHARS else None
+    if text is None or len(text) > SMS_MAX_CHARS:
+        logger.warning(f"SMS too long from {redacted_number}: {len(raw_text)} bytes")
         await send_sms_reply(
             to=from_number,
             message="Your message is too long. Please keep queries under 500 characters."
@@ -146,52 +343,62 @@ async def inbound_sms(
             to=from_number
         )
     
-    # Security checks
+    # Security checks (one fused pass over the message)
+    checks = QueryVerdict.CLEAN
+    if settings.enable_pii_filter:
+        checks |= QueryVerdict.PII
+    if settings.enable_toxicity_filter:
+        checks |= QueryVerdict.TOXIC
+    
     try:
-        # Check for PII (warn user, don't block - they might legitimately mention names)
-        if settings.enable_pii_filter:
-            pii_detected = await check_pii(text)
-            if pii_detected:
-                logger.info(f"PII detected in SMS from {redacted_number}")
-                await send_sms_reply(
-                    to=from_number,
-                    message="Warning: Your message may contain personal information. "
-                            "This has been noted for privacy protection."
-                )
+        verdict = await analyze_query(text, checks)
         
-        # Check for toxic content (block if detected)
-        if settings.enable_toxicity_filter:
-            is_toxic = await check_toxicity(text)
-            if is_toxic:
-                logger.warning(f"Toxic content in SMS from {redacted_number}")
-                await send_sms_reply(
-                    to=from_number,
-                    message="Your message contains inappropriate content. "
-                            "Please rephrase your question respectfully."
-                )
-                return SMSResponse(
-                    status="rejected",
-                    message="Toxic content detected",
-                    to=from_number
-                )
+        # PII: warn user, don't block - they might legitimately mention names
+        if verdict & QueryVerdict.PII:
+            logger.info(f"PII detected in SMS from {redacted_number}")
+            await send_sms_reply(
+                to=from_number,
+                message="Warning: Your message may contain personal information. "
+                        "This has been noted for privacy protection."
+            )
+        
+        # Toxic content: block
+        if verdict & QueryVerdict.TOXIC:
+            logger.warning(f"Toxic content in SMS from {redacted_number}")
+            await send_sms_reply(
+                to=from_number,
+                message="Your message contains inappropriate content. "
+                        "Please rephrase your question respectfully."
+            )
+            return SMSResponse(
+                status="rejected",
+                message="Toxic content detected",
+                to=from_number
+            )
     
     except Exception as e:
         logger.error(f"Security check error: {str(e)}")
         # Continue processing - don't fail on security check errors
     
-    # Process in background to return 200 OK quickly (Africa's Talking timeout)
-    background_tasks.add_task(
-        process_sms_research,
-        query=text,
-        from_number=from_number,
-        message_id=id,
-        link_id=linkId
+    # Send the acknowledgment and start research concurrently, without
+    # waiting on either, to return 200 OK quickly (Africa's Talking timeout)
+    _spawn(
+        send_sms_reply(
+            to=from_number,
+            message="🔍 Researching your question... You'll receive an answer shortly (usually 30-60 seconds)."
+        ),
+        name=f"sms-ack-{id}"
     )
-    
-    # Send immediate acknowledgment
-    await send_sms_reply(
-        to=from_number,
-        message="🔍 Researching your question... You'll receive an answer shortly (usually 30-60 seconds)."
+    _spawn(
+        process_sms_research(
+            agent=agent,
+            query=text,
+            from_number=from_number,
+            message_id=id,
+            link_id=linkId,
+            sanitize=settings.enable_pii_filter
+        ),
+        name=f"sms-{id}"
     )
     
     logger.info(f"SMS queued for processing: message_id={id}")
@@ -205,10 +412,12 @@ async def inbound_sms(
 
 
 async def process_sms_research(
+    agent: ResearchAgent,
     query: str,
     from_number: str,
     message_id: Optional[str] = None,
-    link_id: Optional[str] = None
+    link_id: Optional[str] = None,
+    sanitize: bool = True
 ) -> None:
     """
     Background task to process SMS research and send reply.
@@ -217,22 +426,46 @@ async def process_sms_research(
     to avoid Africa's Talking timeouts (typically 30 seconds).
     
     Args:
+        agent: Research agent to run the query with
         query: Research question from SMS
         from_number: Sender's phone number
         message_id: Original message ID
         link_id: Thread ID for conversation tracking
+        sanitize: Whether to redact PII from the reply
     """
-    redacted_number = f"{from_number[:6]}***{from_number[-3:]}" if len(from_number) > 9 else "***"
+    redacted_number = _redact(from_number)
+    
+    # Webhook retries and resent questions from the same conversation are
+    # answered once; a duplicate arriving mid-run is dropped
+    key = _dedup_key(query, link_id or from_number)
+    if key in _sms_inflight:
+        logger.info(f"Duplicate SMS research for {redacted_number} already in progress")
+        return
     
     try:
         logger.info(f"Processing SMS research for {redacted_number}")
         
-        # Run research agent with SMS-optimized settings
-        result = await agent.run(
-            query=query,
-            source='sms',
-            max_iterations=2  # Fewer iterations for faster SMS response
-        )
+        result = _recent_result(key)
+        if result is None:
+            _sms_inflight.add(key)
+            try:
+                # Sender slot first, so one sender's backlog never holds
+                # global slots while it waits
+                async with _sender_slot(from_number), _research_slots:
+                    # Run research agent with SMS-optimized settings
+                    result = await agent.run(
+                        query=query,
+                        source='sms',
+                        max_iterations=2  # Fewer iterations for faster SMS response
+                    )
+            finally:
+                _sms_inflight.discard(key)
+            # Failed runs come back as an error response; a retry should
+            # run again rather than replay the failure
+            if not result.get('metadata', {}).get('error'):
+                _remember_result(key, result)
+        else:
+            logger.info(f"Reusing recent SMS research result for {redacted_number}")
         
         # Format SMS-friendly response
         sms_response = format_sms_response(
@@ -242,7 +475,7 @@ async def process_sms_research(
         )
         
         # Sanitize output
-        if settings.enable_pii_filter:
+        if sanitize:
             sms_response = await sanitize_output(sms_response)
         
         # Send the research result
@@ -259,24 +492,101 @@ async def process_sms_research(
     except ConnectionError as e:
         logger.error(f"SMS gateway connection error: {str(e)}")
         # Attempt to notify user of failure
-        try:
-            await send_sms_reply(
-                to=from_number,
-                message="Sorry, we're experiencing technical difficulties. Please try again later."
-            )
-        except:
-            pass
+        await _notify_failure(
+            from_number,
+            "Sorry, we're experiencing technical difficulties. Please try again later."
+        )
     
     except Exception as e:
         logger.error(f"Error processing SMS research: {str(e)}", exc_info=True)
         # Attempt to send error message
-        try:
-            await send_sms_reply(
-                to=from_number,
-                message="Sorry, an error occurred while researching your question. Please try again."
-            )
-        except:
-            pass
+        await _notify_failure(
+            from_number,
+            "Sorry, an error occurred while researching your question. Please try again."
+        )
+
+
+def _sender_slot(from_number: str) -> asyncio.Semaphore:
+    """
+    Get the semaphore limiting concurrent research runs for a sender.
+    
+    Args:
+        from_number: Sender's phone number
+        
+    Returns:
+        The sender's semaphore, created on first use
+    """
+    slot = _sender_slots.get(from_number)
+    if slot is None:
+        slot = _sender_slots[from_number] = asyncio.Semaphore(settings.max_sms_research_per_number)
+    return slot
+
+
+def _dedup_key(query: str, conversation: str) -> str:
+    """
+    Key identifying a question within one SMS conversation.
+    
+    Args:
+        query: Research question from SMS
+        conversation: Link ID, or the sender's number when there is none
+        
+    Returns:
+        Hex digest of the normalized query, suffixed with the conversation
+    """
+    digest = hashlib.blake2b(normalize_query(query).encode(), digest_size=16).hexdigest()
+    return f"{digest}:{conversation}"
+
+
+def _recent_result(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a research result completed within SMS_RESULT_TTL seconds.
+    
+    Args:
+        key: Key from _dedup_key()
+        
+    Returns:
+        The cached agent result, or None if absent or expired
+    """
+    entry = _recent_results.get(key)
+    if entry is None:
+        return None
+    
+    stored_at, result = entry
+    if time.monotonic() - stored_at > SMS_RESULT_TTL:
+        del _recent_results[key]
+        return None
+    return result
+
+
+def _remember_result(key: str, result: Dict[str, Any]) -> None:
+    """
+    Cache a completed research result, evicting the oldest beyond the cap.
+    
+    Args:
+        key: Key from _dedup_key()
+        result: Agent result
+    """
+    _recent_results.pop(key, None)
+    _recent_results[key] = (time.monotonic(), result)
+    while len(_recent_results) > SMS_RESULT_CACHE_SIZE:
+        del _recent_results[next(iter(_recent_results))]
+
+
+async def _notify_failure(to: str, message: str) -> None:
+    """
+    Best-effort failure notice to the user, bounded by a short timeout.
+    
+    Args:
+        to: Recipient phone number
+        message: Notice text
+    """
+    try:
+        await asyncio.wait_for(
+            send_sms_reply(to=to, message=message),
+            timeout=FAILURE_NOTICE_TIMEOUT
+        )
+    except Exception as e:
+        logger.warning(f"Could not send failure notice: {e!r}")
 
 
 def format_sms_response(answer: str, citations: list, max_length: int = 1600) -> str:
@@ -293,38 +603,49 @@ def format_sms_response(answer: str, citations: list, max_length: int = 1600) ->
     Returns:
         Formatted SMS message string
     """
-    # Start with answer (truncate if needed)
-    response = answer
+    parts = [answer]
     
-    # Add top 2-3 citations if available
+    # Add top citations if available
     if citations:
-        response += "\n\n📚 Sources:"
-        citation_count = min(3, len(citations))
+        parts.append("\n\n📚 Sources:")
         
-        for i, citation in enumerate(citations[:citation_count], 1):
-            url = citation.get('url', '')
-            title = citation.get('title', 'Source')
-            
-            # Shorten URLs for SMS
-            short_url = url.replace('https://', '').replace('http://', '')
-            if len(short_url) > 40:
-                short_url = short_url[:37] + '...'
-            
-            response += f"\n{i}. {short_url}"
+        for i, citation in enumerate(citations[:SMS_MAX_CITATIONS], 1):
+            parts.append(f"\n{i}. {_short_url(str(citation.get('url', '')))}")
+    
+    response = "".join(parts)
     
     # Truncate if too long
     if len(response) > max_length:
-        response = response[:max_length - 50] + "... (truncated)\n\nFor full results, visit our web app."
+        response = response[:max_length - len(SMS_TRUNCATION_SUFFIX)] + SMS_TRUNCATION_SUFFIX
     
     return response
 
 
-async def verify_webhook_signature(request: Request, secret: str) -> None:
+def _short_url(url: str) -> str:
+    """
+    Shorten a URL for SMS: drop the scheme and cap it at SMS_MAX_URL_LENGTH.
+    
+    Args:
+        url: Citation URL
+        
+    Returns:
+        Shortened URL, ending in "..." if it was cut
+    """
+    url = url.removeprefix('https://').removeprefix('http://')
+    if len(url) > SMS_MAX_URL_LENGTH:
+        return url[:SMS_MAX_URL_LENGTH - 3] + '...'
+    return url
+
+
+def verify_webhook_signature(request: Request, body: bytes, secret: str) -> None:
     """
     Verify Africa's Talking webhook signature for security.
     
+    SignedWebhookRoute calls it with the raw body ahead of form parsing.
+    
     Args:
-        request: FastAPI request object
+        request: FastAPI request object (for the signature header)
+        body: Raw request body
         secret: Webhook secret key from Africa's Talking
         
     Raises:
@@ -336,31 +657,60 @@ async def verify_webhook_signature(request: Request, secret: str) -> None:
     if not signature:
         raise ValueError("Missing webhook signature")
     
-    # Get raw request body
-    body = await request.body()
+    # Hash the body starting from the pre-keyed HMAC state
+    mac = _hmac_template(secret).copy()
+    mac.update(body)
     
-    # Compute expected signature
-    expected_signature = hmac.new(
-        secret.encode(),
-        body,
-        hashlib.sha256
-    ).hexdigest()
-    
-    # Compare signatures securely
-    if not hmac.compare_digest(signature, expected_signature):
+    # Compare raw digests securely (non-hex signatures raise ValueError)
+    if not hmac.compare_digest(bytes.fromhex(signature), mac.digest()):
         raise ValueError("Invalid webhook signature")
 
 
+@lru_cache(maxsize=4096)
+def _redact(number: str) -> str:
+    """
+    Redact a phone number for logging, keeping its prefix and last digits.
+    
+    Cached because the same senders recur across webhooks and retries.
+    
+    Args:
+        number: Phone number (E.164 format)
+        
+    Returns:
+        Redacted number, e.g. "+25471***678"
+    """
+    return f"{number[:6]}***{number[-3:]}" if len(number) > 9 else "***"
+
+
+@lru_cache(maxsize=None)
+def _hmac_template(secret: str) -> hmac.HMAC:
+    """
+    Build the keyed HMAC-SHA256 state for a webhook secret once.
+    
+    Copying it per request skips re-deriving the inner and outer key pads.
+    
+    Args:
+        secret: Webhook secret key
+        
+    Returns:
+        HMAC object with no message data; copy() before updating
+    """
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+
 @router.get(
     "/health",
     tags=["health"],
     summary="SMS service health check"
 )
-async def sms_health_check():
+async def sms_health_check(settings: Settings = Depends(get_settings)):
     """
     Health check for SMS service.
     
     Verifies Africa's Talking credentials and connectivity.
+    
+    Args:
+        settings: Application settings (injected)
     """
     health = {
         "status": "healthy",
@@ -369,8 +719,11 @@ async def sms_health_check():
     }
     
     # Check if credentials are configured
-    if not settings.africas_talking_api_key or not settings.africas_talking_username:
+    if not settings.AT_API_KEY or not settings.AT_USERNAME:
         health["status"] = "unhealthy"
         health["error"] = "Missing Africa's Talking credentials"
     
     return health
+
+
+router.include_router(webhook_router)
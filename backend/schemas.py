@@ -10,10 +10,17 @@ The schemas are organized by functionality:
 - Shared data models (Citation, TimelineStep)
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, validator, HttpUrl
+from typing import Annotated, List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
 from datetime import datetime
 from enum import Enum
+from urllib.parse import urlsplit
+
+
+# Length and whitespace checks are declared as constraints so pydantic-core
+# enforces them without a Python validator call
+QueryText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=1000)]
+SMSText = Annotated[str, StringConstraints(min_length=1, max_length=500)]
 
 
 class QuerySource(str, Enum):
@@ -44,12 +51,10 @@ class ResearchRequest(BaseModel):
         }
         ```
     """
-    query: str = Field(
+    query: QueryText = Field(
         ...,
-        min_length=1,
-        max_length=1000,
         description="Research question or query text",
-        example="What are the latest developments in quantum computing?"
+        examples=["What are the latest developments in quantum computing?"]
     )
     source: QuerySource = Field(
         default=QuerySource.WEB_UI,
@@ -66,25 +71,17 @@ class ResearchRequest(BaseModel):
         description="Include step-by-step timeline in response"
     )
     
-    @validator('query')
-    def validate_query(cls, v):
-        """Validate and sanitize query string."""
-        # Remove leading/trailing whitespace
-        v = v.strip()
-        
-        # Ensure query is not empty after stripping
-        if not v:
-            raise ValueError("Query cannot be empty or only whitespace")
-        
-        # Check for excessive newlines or special characters
+    @field_validator('query', mode='after')
+    @classmethod
+    def validate_query(cls, v: str) -> str:
+        """Reject queries with excessive line breaks (already stripped)."""
         if v.count('\n') > 5:
             raise ValueError("Query contains too many line breaks")
         
         return v
     
-    class Config:
-        """Pydantic model configuration."""
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "query": "What are the environmental impacts of electric vehicles?",
                 "source": "web_ui",
@@ -92,6 +89,7 @@ class ResearchRequest(BaseModel):
                 "include_timeline": True
             }
         }
+    )
 
 
 class Citation(BaseModel):
@@ -125,24 +123,24 @@ class Citation(BaseModel):
         min_length=1,
         max_length=500,
         description="Title of the cited source",
-        example="Quantum Computing Advances in 2025"
+        examples=["Quantum Computing Advances in 2025"]
     )
     url: str = Field(
         ...,
-        description="URL of the source document",
-        example="https://example.com/quantum-computing-2025"
+        description="URL of the source document (http or https)",
+        examples=["https://example.com/quantum-computing-2025"]
     )
     snippet: Optional[str] = Field(
         None,
         max_length=1000,
         description="Relevant excerpt from the source",
-        example="Researchers have achieved a breakthrough in quantum error correction..."
+        examples=["Researchers have achieved a breakthrough in quantum error correction..."]
     )
     source: Optional[str] = Field(
         None,
         max_length=200,
         description="Name of the source provider or publication",
-        example="Nature Journal"
+        examples=["Nature Journal"]
     )
     relevance_score: Optional[float] = Field(
         None,
@@ -155,16 +153,18 @@ class Citation(BaseModel):
         description="Timestamp when source was accessed"
     )
     
-    @validator('url')
-    def validate_url(cls, v):
-        """Ensure URL is properly formatted."""
-        if not v.startswith(('http://', 'https://')):
-            raise ValueError("URL must start with http:// or https://")
+    @field_validator('url', mode='after')
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        """Require an http(s) URL with a host, returned exactly as given."""
+        parts = urlsplit(v)
+        if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+            raise ValueError("URL must be an http or https address")
+        
         return v
     
-    class Config:
-        """Pydantic model configuration."""
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "title": "Quantum Computing Breakthrough",
                 "url": "https://example.com/article",
@@ -174,6 +174,7 @@ class Citation(BaseModel):
                 "accessed_at": "2025-01-15T10:30:00Z"
             }
         }
+    )
 
 
 class TimelineStep(BaseModel):
@@ -205,12 +206,12 @@ class TimelineStep(BaseModel):
     step: str = Field(
         ...,
         description="Step identifier or name",
-        example="web_search"
+        examples=["web_search"]
     )
     description: str = Field(
         ...,
         description="Human-readable description of the step",
-        example="Performed web search with 3 queries"
+        examples=["Performed web search with 3 queries"]
     )
     details: Optional[Dict[str, Any]] = Field(
         None,
@@ -228,12 +229,11 @@ class TimelineStep(BaseModel):
     status: str = Field(
         default="success",
         description="Step execution status",
-        example="success"
+        examples=["success"]
     )
     
-    class Config:
-        """Pydantic model configuration."""
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "step": "reflection",
                 "description": "Reflected on search results quality",
@@ -246,6 +246,7 @@ class TimelineStep(BaseModel):
                 "status": "success"
             }
         }
+    )
 
 
 class ResearchResponse(BaseModel):
@@ -272,7 +273,7 @@ class ResearchResponse(BaseModel):
             "query": "What are quantum computing developments?",
             "completed_at": "2025-01-15T10:30:20Z",
             "total_duration_ms": 15000,
-            "metadata": {"iterations": 2, "sources_found": 12}
+            "metadata": {"iterations": 2, "sources_found": 12, "sources_used": 8}
         }
         ```
     """
@@ -280,7 +281,7 @@ class ResearchResponse(BaseModel):
         ...,
         min_length=1,
         description="Synthesized research answer with citations",
-        example="Quantum computing has seen significant advances in 2025..."
+        examples=["Quantum computing has seen significant advances in 2025..."]
     )
     citations: List[Citation] = Field(
         default_factory=list,
@@ -308,9 +309,8 @@ class ResearchResponse(BaseModel):
         description="Additional metadata about the research process"
     )
     
-    class Config:
-        """Pydantic model configuration."""
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "answer": "Quantum computing has advanced significantly...",
                 "citations": [
@@ -333,6 +333,7 @@ class ResearchResponse(BaseModel):
                 "total_duration_ms": 15000
             }
         }
+    )
 
 
 class SMSInboundRequest(BaseModel):
@@ -354,45 +355,42 @@ class SMSInboundRequest(BaseModel):
         ...,
         alias="from",
         description="Sender's phone number in E.164 format",
-        example="+254712345678"
+        examples=["+254712345678"]
     )
     to: str = Field(
         ...,
         description="Destination number (your shortcode or long number)",
-        example="20880"
+        examples=["20880"]
     )
-    text: str = Field(
+    text: SMSText = Field(
         ...,
-        min_length=1,
-        max_length=500,
         description="SMS message text",
-        example="What is quantum computing?"
+        examples=["What is quantum computing?"]
     )
     date: Optional[str] = Field(
         None,
         description="Message timestamp from provider",
-        example="2025-01-15 10:30:00"
+        examples=["2025-01-15 10:30:00"]
     )
     id: Optional[str] = Field(
         None,
         description="Unique message ID from Africa's Talking",
-        example="ATXid_abc123xyz"
+        examples=["ATXid_abc123xyz"]
     )
     linkId: Optional[str] = Field(
         None,
         description="Link ID for message threading",
-        example="SampleLinkId123"
+        examples=["SampleLinkId123"]
     )
     networkCode: Optional[str] = Field(
         None,
         description="Mobile network operator code",
-        example="63902"
+        examples=["63902"]
     )
     
-    class Config:
-        """Pydantic model configuration."""
-        allow_population_by_field_name = True
-        schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "from": "+254712345678",
                 "to": "20880",
@@ -403,6 +401,7 @@ class SMSInboundRequest(BaseModel):
                 "networkCode": "63902"
             }
         }
+    )
 
 
 class SMSResponse(BaseModel):
@@ -421,17 +420,17 @@ class SMSResponse(BaseModel):
     status: str = Field(
         ...,
         description="Processing status",
-        example="accepted"
+        examples=["accepted"]
     )
     message: str = Field(
         ...,
         description="Human-readable status message",
-        example="Research queued successfully"
+        examples=["Research queued successfully"]
     )
     to: str = Field(
         ...,
         description="Phone number the response pertains to",
-        example="+254712345678"
+        examples=["+254712345678"]
     )
     message_id: Optional[str] = Field(
         None,
@@ -442,9 +441,8 @@ class SMSResponse(BaseModel):
         description="Error details if processing failed"
     )
     
-    class Config:
-        """Pydantic model configuration."""
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "accepted",
                 "message": "Research queued successfully",
@@ -452,6 +450,7 @@ class SMSResponse(BaseModel):
                 "message_id": "ATXid_abc123"
             }
         }
+    )
 
 
 class HealthCheckResponse(BaseModel):
@@ -470,12 +469,12 @@ class HealthCheckResponse(BaseModel):
     status: str = Field(
         ...,
         description="Overall health status",
-        example="healthy"
+        examples=["healthy"]
     )
     service: str = Field(
         ...,
         description="Service name",
-        example="research-api"
+        examples=["research-api"]
     )
     components: Dict[str, str] = Field(
         default_factory=dict,
@@ -490,9 +489,8 @@ class HealthCheckResponse(BaseModel):
         description="Application version"
     )
     
-    class Config:
-        """Pydantic model configuration."""
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "service": "research-api",
@@ -505,3 +503,4 @@ class HealthCheckResponse(BaseModel):
                 "version": "1.0.0"
             }
         }
+    )
@@ -11,23 +11,199 @@ consistent error handling and retry logic.
 """
 
 import os
+import atexit
+import functools
 import logging
-from typing import Optional, Dict, List, Any
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, AsyncIterator, Set, Tuple
 import asyncio
 import httpx
+import orjson
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from ..config import settings
+from ..utils.cache import cache_manager, cache_result, normalize_query
 
 logger = logging.getLogger(__name__)
 
+# Markdown code fence models sometimes wrap JSON in, with optional language tag
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
 # Initialize Gemini
 genai.configure(api_key=settings.GEMINI_API_KEY)
 
 
+class TokenBucket:
+    """
+    Client-side token bucket with multiplicative back-off.
+    
+    Callers wait for a token before each request, so load above the quota
+    queues locally instead of turning into 429s and retries. A throttle()
+    call (on a 429) halves the rate; each quiet cool-down window then
+    restores a quarter of the configured rate.
+    
+    Attributes:
+        base_rate: Configured tokens per second
+        rate: Current tokens per second (lowered after throttling)
+        capacity: Maximum tokens held (burst size)
+    """
+    
+    # Seconds between rate recovery steps after throttling
+    COOLDOWN = 5.0
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._cooldown_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, cost: float = 1.0) -> None:
+        """
+        Wait until cost tokens are available and take them.
+        
+        Waiters are served in arrival order.
+        
+        Args:
+            cost: Tokens to take
+        """
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+    
+    def throttle(self) -> None:
+        """Halve the rate after the server reported throttling."""
+        self._refill()
+        self.rate = max(self.base_rate / 16, self.rate / 2)
+        self._cooldown_until = time.monotonic() + self.COOLDOWN
+        logger.warning(f"Gemini throttled; client rate lowered to {self.rate:.2f}/s")
+    
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed and step the rate back up."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.rate < self.base_rate and now >= self._cooldown_until:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 4)
+            self._cooldown_until = now + self.COOLDOWN
+
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+@lru_cache(maxsize=64)
+def _render_schema_instruction(schema_json: str) -> str:
+    """
+    Render the JSON-only answer instruction for a response schema.
+    
+    Args:
+        schema_json: Response schema serialized with sorted keys
+        
+    Returns:
+        Instruction text appended to structured prompts
+    """
+    return f"""Respond ONLY with valid JSON matching this schema:
+{schema_json}
+
+Do not include any explanation, markdown formatting, or additional text.
+"""
+
+
+# Shared by every GeminiLLM, since the quota belongs to the API key
+_gemini_bucket = TokenBucket(settings.llm_requests_per_second, settings.llm_burst)
+
+# Caps Gemini requests in progress per worker; a burst beyond it queues here
+# instead of opening more connections and threads
+_gemini_slots = asyncio.Semaphore(settings.llm_max_concurrency)
+
+# Requests holding a slot and requests waiting for one, for the metrics endpoint
+_gemini_load = {"in_flight": 0, "queued": 0}
+
+
+@asynccontextmanager
+async def _gemini_slot() -> AsyncIterator[None]:
+    """Hold a Gemini concurrency slot, keeping the load counters current."""
+    _gemini_load["queued"] += 1
+    try:
+        await _gemini_slots.acquire()
+    finally:
+        _gemini_load["queued"] -= 1
+    
+    _gemini_load["in_flight"] += 1
+    try:
+        yield
+    finally:
+        _gemini_load["in_flight"] -= 1
+        _gemini_slots.release()
+
+
+def llm_concurrency_snapshot() -> Dict[str, int]:
+    """
+    Report Gemini request concurrency for the metrics endpoint.
+    
+    Returns:
+        Requests in progress, requests queued for a slot, and the limit
+    """
+    return {
+        "llm_requests_in_flight": _gemini_load["in_flight"],
+        "llm_requests_queued": _gemini_load["queued"],
+        "llm_max_concurrency": settings.llm_max_concurrency
+    }
+
+# The Gemini SDK blocks a thread for a whole request; a dedicated pool keeps
+# slow LLM calls from filling the default executor other code relies on
+GEMINI_MAX_WORKERS = 64
+_gemini_executor = ThreadPoolExecutor(
+    max_workers=GEMINI_MAX_WORKERS,
+    thread_name_prefix="gemini"
+)
+atexit.register(_gemini_executor.shutdown, wait=False)
+
+
+async def run_in_gemini_executor(fn, *args, **kwargs):
+    """
+    Run a blocking Gemini SDK call on the dedicated Gemini thread pool.
+    
+    Args:
+        fn: Synchronous SDK callable
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+        
+    Returns:
+        The callable's return value
+        
+    Example:
+        >>> response = await run_in_gemini_executor(model.generate_content, prompt)
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _gemini_executor,
+        functools.partial(fn, *args, **kwargs)
+    )
+
+
 class GeminiLLM:
     """
     Google Gemini LLM wrapper with error handling and safety settings.
@@ -37,6 +213,8 @@ class GeminiLLM:
     - Safety settings configuration
     - Response streaming support
     - Token usage tracking
+    - In-process TTL/LRU cache of completions for repeated prompts, backed
+      by a shared Redis tier so other workers and restarts reuse them
     """
     
     def __init__(
@@ -57,6 +235,14 @@ class GeminiLLM:
         self.temperature = temperature
         self.max_tokens = max_tokens
         
+        # Prompt digest -> (monotonic expiry, completion), least recent first
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Prompt digest -> request in progress, so identical concurrent
+        # prompts share one API call
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
         # Configure safety settings (allow research content)
         self.safety_settings = {
             HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
@@ -65,6 +251,23 @@ class GeminiLLM:
             HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
         }
         
+        # The same settings in the REST API's JSON form
+        self._rest_safety_settings = [
+            {"category": category.name, "threshold": threshold.name}
+            for category, threshold in self.safety_settings.items()
+        ]
+        
+        # Sampling settings are fixed per instance, so build them once
+        self._generation_config = genai.GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens
+        )
+        self._rest_generation_config = {
+            "temperature": self.temperature,
+            "maxOutputTokens": self.max_tokens
+        }
+        self._rest_endpoint = f"/models/{self.model_name.removeprefix('models/')}:generateContent"
+        
         # Initialize model
         try:
             self.model = genai.GenerativeModel(
@@ -85,6 +288,12 @@ class GeminiLLM:
         """
         Generate text completion from Gemini.
         
+        Completions are cached for settings.llm_cache_ttl seconds, keyed by
+        model, sampling settings, system instruction and prompt, so repeated
+        prompts skip the API call. Lookups try the in-process cache, then
+        Redis (when caching is enabled), then the API; identical prompts
+        already in flight wait for that request instead of sending another.
+        
         Args:
             prompt: Input prompt text
             system_instruction: Optional system instruction
@@ -94,8 +303,9 @@ class GeminiLLM:
             Generated text response
             
         Raises:
-            ValueError: If prompt is empty
-            ConnectionError: If API is unreachable
+            ValueError: If prompt is empty, or the API rejected the request
+                (4xx other than 429) or returned an empty/blocked response
+            ConnectionError: If API is unreachable or stays rate limited
             Exception: For other API errors
             
         Example:
@@ -106,37 +316,109 @@ class GeminiLLM:
         if not prompt or not prompt.strip():
             raise ValueError("Prompt cannot be empty")
         
+        key = self._cache_key(prompt, system_instruction)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        # Concurrent callers with the same prompt share one API request
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._request(key, prompt, system_instruction, max_retries)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._request_finished(key, t))
+        
+        # Shielded so one cancelled caller doesn't cancel the shared request
+        return await asyncio.shield(task)
+    
+    def _request_finished(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished request from the in-flight map."""
+        self._inflight.pop(key, None)
+        # Mark the error retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    async def _request(
+        self,
+        key: str,
+        prompt: str,
+        system_instruction: Optional[str],
+        max_retries: int
+    ) -> str:
+        """
+        Check the shared cache, then call the Gemini API with retries and
+        cache the completion in both tiers.
+        
+        Args:
+            key: Digest from _cache_key()
+            prompt: Input prompt text
+            system_instruction: Optional system instruction
+            max_retries: Maximum retry attempts on failure
+            
+        Returns:
+            Generated text response
+        
+        Raises:
+            ValueError: If the API rejected the request or returned nothing
+            ConnectionError: If API is unreachable or stays rate limited
+        """
+        shared = await self._shared_cache_get(key)
+        if shared is not None:
+            self._cache_put(key, shared)
+            return shared
+        
+        # Add system instruction if provided
+        if system_instruction:
+            full_prompt = f"{system_instruction}\n\n{prompt}"
+        else:
+            full_prompt = prompt
+        
         for attempt in range(max_retries):
             try:
                 logger.debug(f"Gemini API call (attempt {attempt + 1}/{max_retries})")
                 
-                # Configure generation parameters
-                generation_config = genai.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens
-                )
-                
-                # Add system instruction if provided
-                if system_instruction:
-                    full_prompt = f"{system_instruction}\n\n{prompt}"
-                else:
-                    full_prompt = prompt
-                
-                # Generate response
-                response = await asyncio.to_thread(
-                    self.model.generate_content,
-                    full_prompt,
-                    generation_config=generation_config
-                )
+                # Generate response once a concurrency slot is free and the
+                # client-side rate limit allows; backoff sleeps hold no slot
+                async with _gemini_slot():
+                    await _gemini_bucket.acquire()
+                    if settings.gemini_use_sdk:
+                        response = await run_in_gemini_executor(
+                            self.model.generate_content,
+                            full_prompt,
+                            generation_config=self._generation_config
+                        )
+                        text = response.text if response else None
+                    else:
+                        text = await self._generate_rest(full_prompt)
                 
                 # Extract text from response
-                if response and response.text:
-                    logger.info(f"Gemini response generated ({len(response.text)} chars)")
-                    return response.text
+                if text:
+                    logger.info(f"Gemini response generated ({len(text)} chars)")
+                    self._cache_put(key, text)
+                    await self._shared_cache_put(key, text)
+                    return text
                 else:
                     logger.warning("Empty response from Gemini")
                     raise ValueError("Empty response from LLM")
             
+            except google_exceptions.TooManyRequests as e:
+                # 429: slow every caller down, then retry
+                _gemini_bucket.throttle()
+                logger.error(f"Gemini API rate limited (attempt {attempt + 1}): {str(e)}")
+                
+                if attempt == max_retries - 1:
+                    raise ConnectionError(f"Gemini API still rate limited after {max_retries} attempts")
+                
+                await asyncio.sleep(2 ** attempt)
+            
+            except (google_exceptions.ClientError, ValueError) as e:
+                # Other 4xx errors and empty/blocked responses would fail the
+                # same way again, so they are not retried
+                logger.error(f"Gemini API rejected the request: {str(e)}")
+                raise ValueError(f"Gemini API rejected the request: {str(e)}") from e
+            
             except Exception as e:
                 logger.error(f"Gemini API error (attempt {attempt + 1}): {str(e)}")
                 
@@ -148,6 +430,215 @@ class GeminiLLM:
         
         raise Exception("Unexpected error in Gemini generation")
     
+    async def _generate_rest(self, full_prompt: str) -> str:
+        """
+        Call the generateContent REST endpoint on the pooled async client.
+        
+        HTTP errors are raised as the matching google.api_core exception, so
+        the retry policy in _request() treats both transports alike.
+        
+        Args:
+            full_prompt: Prompt including any system instruction
+            
+        Returns:
+            Text of the first candidate
+            
+        Raises:
+            GoogleAPICallError: On an HTTP error status
+            ValueError: If the prompt was blocked or no candidate returned
+        """
+        response = await _get_gemini_client().post(
+            self._rest_endpoint,
+            json={
+                "contents": [{"role": "user", "parts": [{"text": full_prompt}]}],
+                "generationConfig": self._rest_generation_config,
+                "safetySettings": self._rest_safety_settings
+            }
+        )
+        if response.is_error:
+            raise google_exceptions.from_http_status(response.status_code, response.text[:500])
+        
+        data = orjson.loads(response.content)
+        candidates = data.get("candidates") or []
+        if not candidates:
+            reason = (data.get("promptFeedback") or {}).get("blockReason", "no candidates")
+            raise ValueError(f"Gemini returned no response ({reason})")
+        
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a text completion from Gemini chunk by chunk.
+        
+        The SDK's blocking stream is iterated on a worker thread and chunks
+        are handed to the event loop as they arrive, so consumers see the
+        first text long before the completion finishes. Streams are not
+        cached, coalesced or retried, since output may already have been
+        consumed when an error occurs; use generate() for whole answers.
+        
+        Args:
+            prompt: Input prompt text
+            system_instruction: Optional system instruction
+            
+        Yields:
+            Text chunks in order
+            
+        Raises:
+            ValueError: If prompt is empty, or the API rejected the request
+            ConnectionError: If the API is unreachable or rate limited
+            
+        Example:
+            >>> async for chunk in llm.generate_stream("Explain quantum computing"):
+            ...     print(chunk, end="")
+        """
+        if not prompt or not prompt.strip():
+            raise ValueError("Prompt cannot be empty")
+        
+        full_prompt = f"{system_instruction}\n\n{prompt}" if system_instruction else prompt
+        
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        stop = threading.Event()
+        
+        def pump() -> None:
+            try:
+                stream = self.model.generate_content(
+                    full_prompt,
+                    generation_config=self._generation_config,
+                    stream=True
+                )
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    if chunk.text:
+                        loop.call_soon_threadsafe(chunks.put_nowait, chunk.text)
+            except Exception as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, finished)
+        
+        # The slot is held until the stream has been fully read or abandoned
+        async with _gemini_slot():
+            await _gemini_bucket.acquire()
+            worker = loop.run_in_executor(_gemini_executor, pump)
+            try:
+                while (item := await chunks.get()) is not finished:
+                    if isinstance(item, google_exceptions.TooManyRequests):
+                        _gemini_bucket.throttle()
+                        raise ConnectionError(f"Gemini API rate limited: {str(item)}") from item
+                    if isinstance(item, (google_exceptions.ClientError, ValueError)):
+                        raise ValueError(f"Gemini API rejected the request: {str(item)}") from item
+                    if isinstance(item, Exception):
+                        raise ConnectionError(f"Gemini streaming failed: {str(item)}") from item
+                    yield item
+            finally:
+                # Consumers may stop early; let the worker thread wind down
+                stop.set()
+                await asyncio.shield(worker)
+    
+    def _cache_key(self, prompt: str, system_instruction: Optional[str]) -> str:
+        """
+        Digest everything that determines a completion.
+        
+        Args:
+            prompt: Input prompt text
+            system_instruction: Optional system instruction
+            
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        parts = (
+            self.model_name,
+            str(self.temperature),
+            str(self.max_tokens),
+            system_instruction or "",
+            prompt
+        )
+        return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """
+        Return a cached completion if present and not expired.
+        
+        Args:
+            key: Digest from _cache_key()
+            
+        Returns:
+            Cached completion, or None on a miss
+        """
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            logger.debug(f"LLM cache hit ({self.cache_hits} hits, {self.cache_misses} misses)")
+            return entry[1]
+        
+        if entry is not None:
+            del self._cache[key]
+        self.cache_misses += 1
+        return None
+    
+    def _cache_put(self, key: str, text: str) -> None:
+        """
+        Store a completion, evicting the least recently used entry when full.
+        
+        Args:
+            key: Digest from _cache_key()
+            text: Completion text
+        """
+        if settings.llm_cache_ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + settings.llm_cache_ttl, text)
+        self._cache.move_to_end(key)
+        if len(self._cache) > settings.llm_cache_max_entries:
+            self._cache.popitem(last=False)
+    
+    @staticmethod
+    def _shared_cache_enabled() -> bool:
+        """Whether completions should also go through Redis."""
+        return (
+            settings.enable_caching
+            and settings.llm_cache_ttl > 0
+            and cache_manager._initialized
+        )
+    
+    async def _shared_cache_get(self, key: str) -> Optional[str]:
+        """
+        Look up a completion in the Redis tier shared by all workers.
+        
+        Args:
+            key: Digest from _cache_key()
+            
+        Returns:
+            Cached completion, or None on a miss or when Redis is unavailable
+        """
+        if not self._shared_cache_enabled():
+            return None
+        
+        # Stored wrapped in an object so JSON completions stay strings
+        entry = await cache_manager.get(f"llm:{key}")
+        if isinstance(entry, dict) and isinstance(entry.get("text"), str):
+            logger.debug("LLM shared cache hit")
+            return entry["text"]
+        return None
+    
+    async def _shared_cache_put(self, key: str, text: str) -> None:
+        """
+        Store a completion in the Redis tier shared by all workers.
+        
+        Args:
+            key: Digest from _cache_key()
+            text: Completion text
+        """
+        if self._shared_cache_enabled():
+            await cache_manager.set(f"llm:{key}", {"text": text}, ttl=settings.llm_cache_ttl)
+    
     async def generate_structured(
         self,
         prompt: str,
@@ -167,34 +658,89 @@ class GeminiLLM:
             >>> schema = {"queries": ["string"]}
             >>> result = await llm.generate_structured(prompt, schema)
         """
-        # Add JSON formatting instruction
-        json_prompt = f"""{prompt}
-
-Respond ONLY with valid JSON matching this schema:
-{response_schema}
-
-Do not include any explanation, markdown formatting, or additional text.
-"""
+        # Add JSON formatting instruction (rendered once per schema)
+        schema_key = orjson.dumps(response_schema, option=orjson.OPT_SORT_KEYS).decode()
+        json_prompt = f"{prompt}\n\n{_render_schema_instruction(schema_key)}"
         
         response_text = await self.generate(json_prompt)
         
-        # Clean up response (remove markdown if present)
-        import json
+        # Clean up response (remove markdown fence if present); bare JSON,
+        # the usual case, skips the fence match entirely
         cleaned = response_text.strip()
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]
-        if cleaned.startswith('```'):
-            cleaned = cleaned[3:]
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
+        if not cleaned.startswith(("{", "[")):
+            fenced = _JSON_FENCE_RE.match(cleaned)
+            if fenced:
+                cleaned = fenced.group(1)
         
         try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError as e:
+            return orjson.loads(cleaned)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {str(e)}")
             logger.debug(f"Raw response: {response_text}")
             raise ValueError(f"Invalid JSON response from LLM: {str(e)}")
+    
+    async def embed(
+        self,
+        texts: List[str],
+        task_type: str = "retrieval_query"
+    ) -> List[List[float]]:
+        """
+        Compute embeddings for a batch of texts.
+        
+        Args:
+            texts: Texts to embed
+            task_type: Gemini embedding task type
+            
+        Returns:
+            One embedding vector per input text
+            
+        Example:
+            >>> vectors = await llm.embed(["What is quantum computing?"])
+            >>> print(len(vectors[0]))
+            768
+        """
+        if not texts:
+            return []
+        
+        result = await run_in_gemini_executor(
+            genai.embed_content,
+            model=settings.embedding_model,
+            content=texts,
+            task_type=task_type
+        )
+        return result["embedding"]
+
+
+# Africa's Talking accepts a comma-separated recipient list per request;
+# larger broadcasts are split into requests of this many numbers
+SMS_BULK_MAX_RECIPIENTS = 50
+
+
+def _validate_recipient(to: str) -> None:
+    """
+    Check that a recipient phone number is in E.164 format.
+    
+    Args:
+        to: Recipient phone number
+        
+    Raises:
+        ValueError: If the number is not in E.164 format
+    """
+    if not to or not to.startswith('+'):
+        raise ValueError("Phone number must be in E.164 format (e.g., +254712345678)")
+
+
+def _number_key(number: str) -> str:
+    """
+    Reduce a phone number to its digits for matching gateway replies.
+    
+    Args:
+        number: Phone number, possibly with spaces, dashes or parentheses
+        
+    Returns:
+        The number's digits only, e.g. "254712345678"
+    """
+    return "".join(ch for ch in number if ch.isdigit())
 
 
 class SMSGateway:
@@ -212,6 +758,23 @@ class SMSGateway:
         
         if not self.username or not self.api_key:
             logger.warning("Africa's Talking credentials not configured")
+        
+        # Pooled HTTP/2 client reused for every send, so bursts of replies
+        # share keep-alive connections instead of a handshake per SMS
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(max_keepalive_connections=64),
+            headers={
+                "apiKey": self.api_key or "",
+                "Accept": "application/json"
+            }
+        )
+    
+    async def close(self) -> None:
+        """Close the pooled HTTP client. Call on application shutdown."""
+        await self.client.aclose()
     
     async def send_sms(
         self,
@@ -241,8 +804,7 @@ class SMSGateway:
             True
         """
         # Validate inputs
-        if not to or not to.startswith('+'):
-            raise ValueError("Phone number must be in E.164 format (e.g., +254712345678)")
+        _validate_recipient(to)
         
         if not message or len(message.strip()) == 0:
             raise ValueError("Message cannot be empty")
@@ -259,13 +821,6 @@ class SMSGateway:
         
         try:
             # Prepare request
-            url = f"{self.base_url}/messaging"
-            headers = {
-                "apiKey": self.api_key,
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Accept": "application/json"
-            }
-            
             data = {
                 "username": self.username,
                 "to": to,
@@ -275,25 +830,24 @@ class SMSGateway:
             if sender_id:
                 data["from"] = sender_id
             
-            # Send request
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, data=data)
+            # Send request (form encoding sets the Content-Type)
+            response = await self.client.post("/messaging", data=data)
+            
+            if response.status_code == 201:
+                result = response.json()
+                recipients = result.get("SMSMessageData", {}).get("Recipients", [])
                 
-                if response.status_code == 201:
-                    result = response.json()
-                    recipients = result.get("SMSMessageData", {}).get("Recipients", [])
-                    
-                    if recipients:
-                        status = recipients[0].get("status")
-                        if status == "Success":
-                            logger.info(f"SMS sent successfully to {to}")
-                            return True
-                        else:
-                            logger.error(f"SMS failed: {status}")
-                            return False
-                else:
-                    logger.error(f"SMS API error: {response.status_code} - {response.text}")
-                    return False
+                if recipients:
+                    status = recipients[0].get("status")
+                    if status == "Success":
+                        logger.info(f"SMS sent successfully to {to}")
+                        return True
+                    else:
+                        logger.error(f"SMS failed: {status}")
+                        return False
+            else:
+                logger.error(f"SMS API error: {response.status_code} - {response.text}")
+                return False
         
         except httpx.TimeoutException:
             logger.error("SMS API timeout")
@@ -302,24 +856,161 @@ class SMSGateway:
         except Exception as e:
             logger.error(f"Failed to send SMS: {str(e)}")
             return False
+    
+    async def send_sms_bulk(
+        self,
+        recipients: List[str],
+        message: str,
+        sender_id: Optional[str] = None
+    ) -> Dict[str, bool]:
+        """
+        Send the same SMS to several recipients in as few requests as possible.
+        
+        Recipients are sent SMS_BULK_MAX_RECIPIENTS at a time as one
+        comma-separated ``to`` value, so a broadcast costs one HTTP request
+        per chunk instead of one per number.
+        
+        Args:
+            recipients: Recipient phone numbers (E.164 format)
+            message: SMS message text (max 1600 chars for concatenated)
+            sender_id: Optional sender ID/shortcode
+            
+        Returns:
+            Mapping of each distinct recipient to whether the gateway accepted
+            it; numbers in a chunk whose request timed out map to False
+            
+        Raises:
+            ValueError: If any phone number or the message is invalid
+            ConnectionError: If every request timed out
+            
+        Example:
+            >>> gateway = SMSGateway()
+            >>> await gateway.send_sms_bulk(["+254712345678", "+254722000000"], "Hello!")
+            {'+254712345678': True, '+254722000000': True}
+        """
+        # Validate inputs; duplicates are sent once
+        numbers = list(dict.fromkeys(recipients))
+        for to in numbers:
+            _validate_recipient(to)
+        
+        if not message or len(message.strip()) == 0:
+            raise ValueError("Message cannot be empty")
+        
+        if len(message) > 1600:
+            logger.warning(f"Message truncated from {len(message)} to 1600 chars")
+            message = message[:1600]
+        
+        # Check if credentials are configured
+        if not self.username or not self.api_key:
+            logger.error("Africa's Talking credentials not configured")
+            logger.info(f"[DEV MODE] Would send SMS to {len(numbers)} recipients: {message[:50]}...")
+            return dict.fromkeys(numbers, True)  # Return True in dev mode for testing
+        
+        results = dict.fromkeys(numbers, False)
+        unreachable = 0
+        chunks = [
+            numbers[start:start + SMS_BULK_MAX_RECIPIENTS]
+            for start in range(0, len(numbers), SMS_BULK_MAX_RECIPIENTS)
+        ]
+        for chunk in chunks:
+            # One chunk failing doesn't discard what earlier chunks sent
+            try:
+                results.update(await self._send_bulk_chunk(chunk, message, sender_id))
+            except ConnectionError:
+                unreachable += 1
+        
+        if unreachable == len(chunks):
+            raise ConnectionError("Africa's Talking API timeout")
+        
+        sent = sum(results.values())
+        logger.info(f"Bulk SMS sent to {sent}/{len(numbers)} recipients")
+        return results
+    
+    async def _send_bulk_chunk(
+        self,
+        chunk: List[str],
+        message: str,
+        sender_id: Optional[str]
+    ) -> Dict[str, bool]:
+        """
+        Send one multi-recipient request.
+        
+        Recipients in the reply are matched on their digits, so numbers
+        written with spaces or dashes still resolve.
+        
+        Args:
+            chunk: At most SMS_BULK_MAX_RECIPIENTS validated numbers
+            message: SMS message text
+            sender_id: Optional sender ID/shortcode
+            
+        Returns:
+            Mapping of each number in the chunk to whether it was accepted
+            
+        Raises:
+            ConnectionError: If the request timed out
+        """
+        keys: Dict[str, List[str]] = {}
+        for to in chunk:
+            keys.setdefault(_number_key(to), []).append(to)
+        results = dict.fromkeys(chunk, False)
+        data = {
+            "username": self.username,
+            "to": ",".join(f"+{key}" for key in keys),
+            "message": message
+        }
+        
+        if sender_id:
+            data["from"] = sender_id
+        
+        try:
+            response = await self.client.post("/messaging", data=data)
+        except httpx.TimeoutException:
+            logger.error("SMS API timeout")
+            raise ConnectionError("Africa's Talking API timeout")
+        except Exception as e:
+            logger.error(f"Failed to send bulk SMS: {str(e)}")
+            return results
+        
+        if response.status_code != 201:
+            logger.error(f"SMS API error: {response.status_code} - {response.text}")
+            return results
+        
+        recipients = response.json().get("SMSMessageData", {}).get("Recipients", [])
+        if len(keys) == 1 and len(recipients) == 1:
+            # A single recipient needs no matching
+            return dict.fromkeys(chunk, recipients[0].get("status") == "Success")
+        
+        for recipient in recipients:
+            accepted = recipient.get("status") == "Success"
+            for to in keys.get(_number_key(str(recipient.get("number", ""))), ()):
+                results[to] = accepted
+        return results
 
 
 # Global instances
-_gemini_instance: Optional[GeminiLLM] = None
 _sms_instance: Optional[SMSGateway] = None
+_gemini_client: Optional[httpx.AsyncClient] = None
 
 
-def get_llm() -> GeminiLLM:
+@lru_cache(maxsize=None)
+def get_llm(
+    model_name: str = "gemini-2.5-flash",
+    temperature: float = 0.7
+) -> GeminiLLM:
     """
-    Get singleton Gemini LLM instance.
+    Get the shared Gemini LLM instance for a model configuration.
+    
+    Memoized per ``(model_name, temperature)``, so every caller asking for
+    the same configuration reuses one client.
+    
+    Args:
+        model_name: Gemini model to use
+        temperature: Sampling temperature (0.0-1.0)
     
     Returns:
         Configured GeminiLLM instance
     """
-    global _gemini_instance
-    if _gemini_instance is None:
-        _gemini_instance = GeminiLLM()
-    return _gemini_instance
+    return GeminiLLM(model_name=model_name, temperature=temperature)
 
 
 def get_sms_gateway() -> SMSGateway:
@@ -335,6 +1026,74 @@ def get_sms_gateway() -> SMSGateway:
     return _sms_instance
 
 
+def _get_gemini_client() -> httpx.AsyncClient:
+    """
+    Get the pooled HTTP/2 client for the Gemini REST API.
+    
+    Created on first use, so concurrent generate calls share its
+    connections; close_clients() closes it.
+    
+    Returns:
+        Shared AsyncClient with the API key header set
+    """
+    global _gemini_client
+    if _gemini_client is None:
+        _gemini_client = httpx.AsyncClient(
+            base_url=GEMINI_API_URL,
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_connections=GEMINI_MAX_WORKERS, max_keepalive_connections=20),
+            headers={"x-goog-api-key": settings.GEMINI_API_KEY}
+        )
+    return _gemini_client
+
+
+async def warmup_clients(timeout: float = 5.0) -> None:
+    """
+    Create this module's clients and open their connections ahead of traffic.
+    
+    Builds the default LLM and (if SMS is enabled) the SMS gateway, then
+    sends a HEAD request through each pooled client so DNS, TCP and TLS
+    are done before the first request needs them. No completion is
+    requested, so warmup spends no LLM quota. Failures are logged only.
+    
+    Call this function during FastAPI startup.
+    
+    Args:
+        timeout: Seconds to wait for each connection
+    """
+    get_llm()
+    
+    clients = []
+    if not settings.gemini_use_sdk:
+        clients.append(("Gemini", _get_gemini_client()))
+    if settings.enable_sms:
+        clients.append(("Africa's Talking", get_sms_gateway().client))
+    
+    async def preconnect(name: str, client: httpx.AsyncClient) -> None:
+        try:
+            await client.head("/", timeout=timeout)
+        except httpx.HTTPError as e:
+            logger.warning(f"{name} warmup failed: {str(e)}")
+    
+    await asyncio.gather(*(preconnect(name, client) for name, client in clients))
+
+
+async def close_clients() -> None:
+    """
+    Close pooled HTTP clients held by this module.
+    
+    Call this function during FastAPI shutdown.
+    """
+    global _sms_instance, _gemini_client
+    if _sms_instance is not None:
+        await _sms_instance.close()
+        _sms_instance = None
+    if _gemini_client is not None:
+        await _gemini_client.aclose()
+        _gemini_client = None
+
+
 # Convenience functions for backward compatibility
 async def call_llm(
     prompt: str,
@@ -360,6 +1119,107 @@ async def call_llm(
     return await llm.generate(prompt, system_instruction)
 
 
+# Identical replies sent within SMS_BATCH_MAX_WAIT seconds of each other go
+# out as one multi-recipient request
+SMS_BATCH_MAX_WAIT = 0.05
+
+
+class _SMSBatcher:
+    """
+    Coalesces identical outgoing SMS into multi-recipient sends.
+    
+    Notices such as usage hints and failure messages are often sent to many
+    users at once; each distinct (message, sender ID) pair collects
+    recipients for a short window and is then sent with send_sms_bulk().
+    """
+    
+    def __init__(
+        self,
+        max_size: int = SMS_BULK_MAX_RECIPIENTS,
+        max_wait: float = SMS_BATCH_MAX_WAIT
+    ):
+        """
+        Initialize an empty batcher.
+        
+        Args:
+            max_size: Recipients per request
+            max_wait: Seconds to hold an open batch for more recipients
+        """
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: Dict[Tuple[str, Optional[str]], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, Optional[str]], asyncio.TimerHandle] = {}
+        # Strong references to sends in progress (the loop's are weak)
+        self._running: Set[asyncio.Task] = set()
+    
+    async def submit(self, to: str, message: str, sender_id: Optional[str]) -> bool:
+        """
+        Queue a recipient for the next batch of this message and wait for it.
+        
+        Args:
+            to: Recipient phone number (E.164 format)
+            message: SMS message text
+            sender_id: Optional sender ID
+            
+        Returns:
+            True if the gateway accepted the message for this recipient
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (message, sender_id)
+        batch = self._pending.setdefault(key, [])
+        batch.append((to, future))
+        
+        if len(batch) >= self.max_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        
+        return await future
+    
+    def _flush(self, key: Tuple[str, Optional[str]]) -> None:
+        """Send the open batch for a key."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if batch:
+            task = asyncio.ensure_future(self._run(key, batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run(
+        self,
+        key: Tuple[str, Optional[str]],
+        batch: List[Tuple[str, asyncio.Future]]
+    ) -> None:
+        """Send one message to a batch and resolve each caller's future."""
+        message, sender_id = key
+        gateway = get_sms_gateway()
+        
+        # One request per chunk; an error only reaches that chunk's callers
+        for start in range(0, len(batch), SMS_BULK_MAX_RECIPIENTS):
+            chunk = batch[start:start + SMS_BULK_MAX_RECIPIENTS]
+            try:
+                results = await gateway.send_sms_bulk(
+                    [to for to, _ in chunk],
+                    message,
+                    sender_id
+                )
+            except Exception as e:
+                for _, future in chunk:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for to, future in chunk:
+                if not future.done():
+                    future.set_result(results.get(to, False))
+
+
+_sms_batcher = _SMSBatcher()
+
+
 async def send_sms_reply(
     to: str,
     message: str,
@@ -369,7 +1229,8 @@ async def send_sms_reply(
     Send SMS reply to a user.
     
     Convenience function that uses the singleton SMS gateway.
-    Includes PII redaction and length validation.
+    Includes PII redaction and length validation. Identical replies to
+    different users within SMS_BATCH_MAX_WAIT seconds share one request.
     
     Args:
         to: Recipient phone number (E.164 format)
@@ -391,19 +1252,274 @@ async def send_sms_reply(
     # Import here to avoid circular dependency
     from ..utils.filters import sanitize_output
     
+    # Reject a bad number here rather than failing the whole batch
+    _validate_recipient(to)
+    
     # Sanitize message (remove PII)
     sanitized_message = await sanitize_output(message)
     
-    # Send via gateway
-    gateway = get_sms_gateway()
-    return await gateway.send_sms(to, sanitized_message, sender_id)
+    # Send via gateway, coalesced with identical replies
+    return await _sms_batcher.submit(to, sanitized_message, sender_id)
+
+
+# Query generations in progress, keyed like _cached_generate_queries()
+_qgen_inflight: Dict[Tuple[str, str, int], asyncio.Task] = {}
+
+
+@cache_result(ttl=settings.query_cache_ttl, key_prefix="queries")
+async def _cached_generate_queries(
+    model_name: str,
+    normalized_question: str,
+    num_queries: int
+) -> Optional[List[str]]:
+    """
+    Generate search queries, cached per model and normalized question.
+    
+    ``model_name`` is only part of the cache key, so switching models never
+    serves queries produced by another one. Errors propagate and empty
+    results return None so that neither is cached.
+    
+    Args:
+        model_name: Name of the model generating the queries
+        normalized_question: Question normalized with normalize_query()
+        num_queries: Number of queries to generate
+        
+    Returns:
+        Generated queries, or None if the model returned none
+    """
+    return await _query_batcher.submit(model_name, normalized_question, num_queries)
+
+
+# Concurrent query generations are coalesced into one LLM call: a batch is
+# sent when it fills up or QUERY_BATCH_MAX_WAIT seconds after it opened
+QUERY_BATCH_MAX_SIZE = 16
+QUERY_BATCH_MAX_WAIT = 0.02
+
+
+class _QueryBatcher:
+    """
+    Micro-batcher for search query generation.
+    
+    Each LLM call has a fixed latency and prompt overhead, so questions
+    arriving together share one structured call instead of one call each.
+    Batches are per (model, num_queries).
+    """
+    
+    def __init__(self, max_size: int = QUERY_BATCH_MAX_SIZE, max_wait: float = QUERY_BATCH_MAX_WAIT):
+        """
+        Initialize an empty batcher.
+        
+        Args:
+            max_size: Questions per LLM call
+            max_wait: Seconds to hold an open batch for more questions
+        """
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: Dict[Tuple[str, int], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, int], asyncio.TimerHandle] = {}
+        # Strong references to batches in progress (the loop's are weak)
+        self._running: Set[asyncio.Task] = set()
+    
+    async def submit(self, model_name: str, question: str, num_queries: int) -> Optional[List[str]]:
+        """
+        Queue a question for the next batch and wait for its queries.
+        
+        Args:
+            model_name: Model generating the queries
+            question: Normalized research question
+            num_queries: Number of queries to generate
+            
+        Returns:
+            Generated queries, or None if the model returned none
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (model_name, num_queries)
+        batch = self._pending.setdefault(key, [])
+        batch.append((question, future))
+        
+        if len(batch) >= self.max_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        
+        return await future
+    
+    def _flush(self, key: Tuple[str, int]) -> None:
+        """Send the open batch for a key."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if batch:
+            task = asyncio.ensure_future(self._run(key, batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run(self, key: Tuple[str, int], batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Generate queries for a batch and resolve each caller's future."""
+        model_name, num_queries = key
+        try:
+            results = await generate_search_queries_batch(
+                [question for question, _ in batch],
+                num_queries,
+                model_name=model_name
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), queries in zip(batch, results):
+            if not future.done():
+                future.set_result(queries or None)
+
+
+_query_batcher = _QueryBatcher()
+
+
+_QUERY_REQUIREMENTS = """Requirements:
+- Make queries specific and targeted
+- Cover different aspects of the topic
+- Use search-engine-friendly language
+- Keep each query concise (3-8 words)"""
+
+
+async def _generate_queries_single(llm: GeminiLLM, question: str, num_queries: int) -> List[str]:
+    """
+    Generate search queries for one question with the single-question prompt.
+    
+    Args:
+        llm: Model to generate with
+        question: Research question
+        num_queries: Number of queries to generate
+        
+    Returns:
+        Generated queries (empty if the model returned none)
+    """
+    prompt = f"""Generate {num_queries} diverse search queries to research this question:
+
+Question: {question}
+
+{_QUERY_REQUIREMENTS}
+
+Return ONLY a JSON array of query strings, nothing else.
+Example: ["query 1", "query 2", "query 3"]"""
+    
+    response = await llm.generate_structured(
+        prompt,
+        {"queries": ["string"]}
+    )
+    return response.get("queries", [])[:num_queries]
+
+
+def _match_batch_results(response: Dict[str, Any], count: int, num_queries: int) -> Optional[List[List[str]]]:
+    """
+    Map a batched response back to its questions, or reject it.
+    
+    Questions from unrelated users share the prompt, so a response is only
+    trusted when it has exactly one well-formed result per question id.
+    
+    Args:
+        response: Parsed model response
+        count: Number of questions in the prompt
+        num_queries: Maximum queries kept per question
+        
+    Returns:
+        One list of queries per question, in order, or None if the ids or
+        result count don't match the questions
+    """
+    results = response.get("results") if isinstance(response, dict) else None
+    if not isinstance(results, list) or len(results) != count:
+        return None
+    
+    by_id: Dict[int, List[str]] = {}
+    for item in results:
+        try:
+            item_id = int(item["id"])
+            queries = item.get("queries", [])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        if item_id in by_id or not 0 <= item_id < count or not isinstance(queries, list):
+            return None
+        if not all(isinstance(query, str) for query in queries):
+            return None
+        by_id[item_id] = queries[:num_queries]
+    
+    return [by_id[i] for i in range(count)]
+
+
+async def generate_search_queries_batch(
+    questions: List[str],
+    num_queries: int = 3,
+    model_name: Optional[str] = None
+) -> List[List[str]]:
+    """
+    Generate search queries for several questions with one LLM call.
+    
+    A single question uses the plain single-question prompt. If the batched
+    response doesn't map cleanly back to the questions (missing, duplicate
+    or out-of-range ids, or the wrong number of results), each question is
+    generated separately instead.
+    
+    Args:
+        questions: Research questions
+        num_queries: Number of queries to generate per question
+        model_name: Gemini model to use (defaults to get_llm()'s)
+        
+    Returns:
+        One list of queries per question, in order (empty if the model
+        returned none for it)
+        
+    Example:
+        >>> await generate_search_queries_batch(["What is AI?", "What is 5G?"], 2)
+        [['artificial intelligence basics', 'AI applications'], ['5G technology', '5G vs 4G']]
+    """
+    llm = get_llm(model_name) if model_name else get_llm()
+    
+    if len(questions) == 1:
+        return [await _generate_queries_single(llm, questions[0], num_queries)]
+    
+    numbered = "\n".join(f"{i}. {question}" for i, question in enumerate(questions))
+    prompt = f"""Generate {num_queries} diverse search queries to research each of these {len(questions)} questions:
+
+{numbered}
+
+{_QUERY_REQUIREMENTS}
+
+Return one result per question, using the question's number as its id."""
+    
+    response = await llm.generate_structured(
+        prompt,
+        {"results": [{"id": "integer", "queries": ["string"]}]}
+    )
+    
+    matched = _match_batch_results(response, len(questions), num_queries)
+    if matched is not None:
+        return matched
+    
+    logger.warning(f"Batched query generation didn't match {len(questions)} questions; generating separately")
+    return list(await asyncio.gather(*(
+        _generate_queries_single(llm, question, num_queries) for question in questions
+    )))
+
+
+def _qgen_finished(key: Tuple[str, str, int], task: asyncio.Task) -> None:
+    """Drop a finished generation from the in-flight map."""
+    _qgen_inflight.pop(key, None)
+    # Mark the error retrieved in case every caller was cancelled
+    if not task.cancelled():
+        task.exception()
 
 
 async def generate_search_queries(question: str, num_queries: int = 3) -> List[str]:
     """
     Generate optimized search queries from a research question.
     
-    Uses Gemini to generate diverse, targeted search queries.
+    Uses Gemini to generate diverse, targeted search queries. Results are
+    cached by normalized question, so repeated questions skip the LLM call,
+    and concurrent calls for the same question share one generation.
     
     Args:
         question: Original research question
@@ -418,32 +1534,24 @@ async def generate_search_queries(question: str, num_queries: int = 3) -> List[s
         ['quantum computing basics', 'quantum computer applications', ...]
     """
     llm = get_llm()
+    key = (llm.model_name, normalize_query(question), num_queries)
     
-    prompt = f"""Generate {num_queries} diverse search queries to research this question:
-
-Question: {question}
-
-Requirements:
-- Make queries specific and targeted
-- Cover different aspects of the topic
-- Use search-engine-friendly language
-- Keep each query concise (3-8 words)
-
-Return ONLY a JSON array of query strings, nothing else.
-Example: ["query 1", "query 2", "query 3"]"""
+    task = _qgen_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_cached_generate_queries(*key))
+        _qgen_inflight[key] = task
+        task.add_done_callback(lambda t: _qgen_finished(key, t))
     
     try:
-        response = await llm.generate_structured(
-            prompt,
-            {"queries": ["string"]}
-        )
+        # Shielded so one cancelled caller doesn't cancel the shared call
+        queries = await asyncio.shield(task)
         
-        queries = response.get("queries", [])
         if not queries:
             logger.warning("No queries generated, using original question")
             return [question]
         
-        return queries[:num_queries]
+        # Callers share the result; give each its own list
+        return list(queries)
     
     except Exception as e:
         logger.error(f"Failed to generate queries: {str(e)}")
@@ -12,28 +12,93 @@ Implements result parsing, ranking, and filtering.
 
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+import re
+from html.parser import HTMLParser
+from typing import List, Dict, Any, AsyncIterator, Optional
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 import httpx
 
 from ..config import settings
 from ..utils.cache import cache_result
 from ..utils.filters import contains_pii_in_document
+from .llm import run_in_gemini_executor
 
 logger = logging.getLogger(__name__)
 
+# Word tokens used to match query terms against result text
+_TOKEN_RE = re.compile(r"\w+")
+
+# Fallback pool for callers that don't pass their own client
+_search_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_search_client() -> httpx.AsyncClient:
+    """
+    Get the module's pooled HTTP/2 client for search requests.
+    
+    Created on first use, so callers without a client of their own still
+    reuse keep-alive connections to the provider hosts;
+    close_search_client() closes it.
+    
+    Returns:
+        Shared AsyncClient
+    """
+    global _search_client
+    if _search_client is None:
+        _search_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(settings.search_timeout),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _search_client
+
+
+async def close_search_client() -> None:
+    """
+    Close the module's pooled search client, if it was created.
+    
+    Call this function during FastAPI shutdown.
+    """
+    global _search_client
+    if _search_client is not None:
+        await _search_client.aclose()
+        _search_client = None
+
+
+@asynccontextmanager
+async def _http_client(
+    client: Optional[httpx.AsyncClient]
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Yield the caller's pooled client, or the module's shared one if none is given.
+    
+    Args:
+        client: Shared client owned by the caller (never closed here)
+        
+    Yields:
+        HTTP client to issue the request with
+    """
+    yield client if client is not None else _get_search_client()
+
 
 class SearchProvider(ABC):
     """Abstract base class for search providers."""
     
     @abstractmethod
-    async def search(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        query: str,
+        num_results: int = 10,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
         """
         Perform web search.
         
         Args:
             query: Search query
             num_results: Maximum number of results
+            client: Optional pooled HTTP client to reuse
             
         Returns:
             List of search result dictionaries
@@ -48,13 +113,19 @@ class MockSearchProvider(SearchProvider):
     Returns synthetic search results without external API calls.
     """
     
-    async def search(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        query: str,
+        num_results: int = 10,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
         """
         Generate mock search results.
         
         Args:
             query: Search query
             num_results: Number of results to generate
+            client: Unused; no HTTP requests are made
             
         Returns:
             List of mock search results
@@ -96,13 +167,19 @@ class SerpAPIProvider(SearchProvider):
         self.api_key = api_key
         self.base_url = "https://serpapi.com/search"
     
-    async def search(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        query: str,
+        num_results: int = 10,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search using SerpAPI.
         
         Args:
             query: Search query
             num_results: Number of results
+            client: Optional pooled HTTP client to reuse
             
         Returns:
             List of search results
@@ -117,8 +194,8 @@ class SerpAPIProvider(SearchProvider):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.base_url, params=params)
+            async with _http_client(client) as http:
+                response = await http.get(self.base_url, params=params)
                 response.raise_for_status()
                 data = response.json()
             
@@ -162,13 +239,19 @@ class BraveSearchProvider(SearchProvider):
         self.api_key = api_key
         self.base_url = "https://api.search.brave.com/res/v1/web/search"
     
-    async def search(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        query: str,
+        num_results: int = 10,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search using Brave Search API.
         
         Args:
             query: Search query
             num_results: Number of results
+            client: Optional pooled HTTP client to reuse
             
         Returns:
             List of search results
@@ -186,8 +269,8 @@ class BraveSearchProvider(SearchProvider):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
+            async with _http_client(client) as http:
+                response = await http.get(
                     self.base_url,
                     headers=headers,
                     params=params
@@ -240,13 +323,19 @@ class GeminiSearchProvider(SearchProvider):
             logger.error("google-generativeai package not installed")
             raise
     
-    async def search(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        query: str,
+        num_results: int = 10,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search using Gemini with Google Search grounding.
         
         Args:
             query: Search query
             num_results: Number of results (limited by Gemini)
+            client: Unused; grounding goes through the Gemini SDK
             
         Returns:
             List of search results from Gemini grounding
@@ -261,7 +350,7 @@ class GeminiSearchProvider(SearchProvider):
             search_tool = Tool(google_search_retrieval=GoogleSearchRetrieval())
             
             # Generate with grounding
-            response = await asyncio.to_thread(
+            response = await run_in_gemini_executor(
                 self.model.generate_content,
                 f"Search and summarize information about: {query}",
                 tools=[search_tool]
@@ -324,13 +413,19 @@ class GoogleCustomSearchProvider(SearchProvider):
         self.engine_id = engine_id
         self.base_url = "https://www.googleapis.com/customsearch/v1"
     
-    async def search(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        query: str,
+        num_results: int = 10,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search using Google Custom Search API.
         
         Args:
             query: Search query
             num_results: Number of results (max 10 per request)
+            client: Optional pooled HTTP client to reuse
             
         Returns:
             List of search results
@@ -345,8 +440,8 @@ class GoogleCustomSearchProvider(SearchProvider):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.base_url, params=params)
+            async with _http_client(client) as http:
+                response = await http.get(self.base_url, params=params)
                 response.raise_for_status()
                 data = response.json()
             
@@ -443,12 +538,13 @@ class SearchService:
             logger.info("Using mock search provider")
             return MockSearchProvider()
     
-    @cache_result(ttl=3600, key_prefix="search")
+    @cache_result(ttl=3600, key_prefix="search", ignore=("client",))
     async def search(
         self,
         query: str,
         num_results: int = None,
-        filter_pii: bool = True
+        filter_pii: bool = True,
+        client: Optional[httpx.AsyncClient] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform web search with filtering and ranking.
@@ -457,6 +553,7 @@ class SearchService:
             query: Search query
             num_results: Maximum results (defaults to settings)
             filter_pii: Whether to filter results containing PII
+            client: Optional pooled HTTP client passed to the provider
             
         Returns:
             List of filtered and ranked search results
@@ -470,7 +567,7 @@ class SearchService:
             num_results = settings.max_search_results
         
         # Perform search
-        results = await self.provider.search(query, num_results)
+        results = await self.provider.search(query, num_results, client=client)
         
         if not results:
             logger.warning(f"No results found for query: {query}")
@@ -518,7 +615,7 @@ class SearchService:
         Rank search results by relevance.
         
         Simple ranking based on:
-        - Query term frequency in title/snippet
+        - Distinct query words found in title/snippet (whole words only)
         - Position in original results
         
         Args:
@@ -528,16 +625,16 @@ class SearchService:
         Returns:
             Ranked list of results
         """
-        query_terms = query.lower().split()
+        query_terms = frozenset(_TOKEN_RE.findall(query.lower()))
         
         for result in results:
             # Calculate relevance score
-            title = result.get("title", "").lower()
-            snippet = result.get("snippet", "").lower()
+            title_terms = _TOKEN_RE.findall(result.get("title", "").lower())
+            snippet_terms = _TOKEN_RE.findall(result.get("snippet", "").lower())
             
             # Count query term matches
-            title_matches = sum(1 for term in query_terms if term in title)
-            snippet_matches = sum(1 for term in query_terms if term in snippet)
+            title_matches = len(query_terms.intersection(title_terms))
+            snippet_matches = len(query_terms.intersection(snippet_terms))
             
             # Calculate score (weighted)
             score = (title_matches * 2.0) + snippet_matches
@@ -557,7 +654,8 @@ class SearchService:
     async def search_multiple(
         self,
         queries: List[str],
-        num_results_per_query: int = 5
+        num_results_per_query: int = 5,
+        client: Optional[httpx.AsyncClient] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform multiple searches concurrently.
@@ -565,6 +663,7 @@ class SearchService:
         Args:
             queries: List of search queries
             num_results_per_query: Results per query
+            client: Optional pooled HTTP client shared by all searches
             
         Returns:
             Combined and deduplicated results
@@ -575,7 +674,7 @@ class SearchService:
         """
         # Execute searches concurrently
         tasks = [
-            self.search(query, num_results=num_results_per_query)
+            self.search(query, num_results=num_results_per_query, client=client)
             for query in queries
         ]
         
@@ -600,15 +699,126 @@ class SearchService:
 search_service = SearchService()
 
 
+# ==================== Page Text ====================
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class _TextExtractor(HTMLParser):
+    """Collect the visible text of an HTML page."""
+    
+    _SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg", "head"})
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def extract_page_text(html: str, max_chars: int) -> str:
+    """
+    Extract visible, whitespace-collapsed text from an HTML document.
+    
+    Args:
+        html: Page HTML
+        max_chars: Maximum characters to keep
+        
+    Returns:
+        Page text, truncated to max_chars
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return _WHITESPACE_RE.sub(" ", " ".join(parser.parts)).strip()[:max_chars]
+
+
+@cache_result(ttl=settings.cache_ttl, key_prefix="page", ignore=("client",))
+async def fetch_page_text(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None
+) -> Optional[str]:
+    """
+    Fetch a search result's page and return its visible text.
+    
+    Cached by URL, so pages shared between queries are fetched once. At
+    most settings.fulltext_max_bytes of the body are read. Page text goes
+    through the same PII check as search results; when it fails, None is
+    returned so synthesis falls back to the already-checked snippet.
+    
+    Args:
+        url: Page URL
+        client: Optional pooled HTTP client to reuse
+        
+    Returns:
+        Page text, or None if the page couldn't be fetched, isn't HTML or
+        contains PII
+    """
+    try:
+        async with _http_client(client) as http:
+            async with http.stream("GET", url, follow_redirects=True) as response:
+                response.raise_for_status()
+                
+                if "html" not in response.headers.get("content-type", ""):
+                    return None
+                
+                # Stop reading once the cap is reached; the parser copes
+                # with a truncated document
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= settings.fulltext_max_bytes:
+                        break
+                html = bytes(body[:settings.fulltext_max_bytes]).decode(
+                    response.charset_encoding or "utf-8",
+                    errors="replace"
+                )
+        
+        # Parsing a large page is CPU-bound; keep it off the event loop
+        text = await asyncio.to_thread(
+            extract_page_text,
+            html,
+            settings.fulltext_max_chars
+        )
+        if not text:
+            return None
+        
+        if settings.enable_pii_filter and await contains_pii_in_document({"content": text}):
+            logger.info(f"Dropped page text with PII for {url}")
+            return None
+        
+        return text
+    
+    except Exception as e:
+        logger.warning(f"Failed to fetch page text for {url}: {str(e)}")
+        return None
+
+
 # ==================== Convenience Functions ====================
 
-async def run_search(query: str, num_results: int = None) -> List[Dict[str, Any]]:
+async def run_search(
+    query: str,
+    num_results: int = None,
+    client: Optional[httpx.AsyncClient] = None
+) -> List[Dict[str, Any]]:
     """
     Convenience function to perform a search.
     
     Args:
         query: Search query
         num_results: Maximum results
+        client: Optional pooled HTTP client to reuse across searches
         
     Returns:
         List of search results
@@ -618,17 +828,21 @@ async def run_search(query: str, num_results: int = None) -> List[Dict[str, Any]
         >>> print(len(results))
         10
     """
-    return await search_service.search(query, num_results)
+    return await search_service.search(query, num_results, client=client)
 
 
-async def search_with_queries(queries: List[str]) -> List[Dict[str, Any]]:
+async def search_with_queries(
+    queries: List[str],
+    client: Optional[httpx.AsyncClient] = None
+) -> List[Dict[str, Any]]:
     """
     Search with multiple queries.
     
     Args:
         queries: List of search queries
+        client: Optional pooled HTTP client shared by all searches
         
     Returns:
         Combined search results
     """
-    return await search_service.search_multiple(queries)
+    return await search_service.search_multiple(queries, client=client)
@@ -127,12 +127,13 @@ Source Documents:
         for i, doc in enumerate(docs[:10], 1):  # Limit to top 10 sources
             title = doc.get('title', 'Unknown')
             url = doc.get('url', '')
-            snippet = doc.get('snippet', '')
+            # Prefer prefetched page text when the agent provided it
+            content = doc.get('full_text') or doc.get('snippet', '')
             source = doc.get('source', 'Web')
             
             prompt += f"\n[Source {i}] {title}\n"
             prompt += f"URL: {url}\n"
-            prompt += f"Content: {snippet}\n"
+            prompt += f"Content: {content}\n"
             prompt += f"Provider: {source}\n"
         
         if context:
@@ -13,8 +13,10 @@ This module uses redis-py with async support (aioredis).
 import json
 import logging
 import hashlib
-from typing import Optional, Any, Dict, List
-from datetime import timedelta
+import re
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Sequence, Tuple
+from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 
 import redis.asyncio as aioredis
@@ -22,6 +24,7 @@ from redis.asyncio import Redis
 from redis.exceptions import RedisError, ConnectionError as RedisConnectionError
 
 from ..config import settings
+from .filters import unit_vector, cosine_scores
 
 logger = logging.getLogger(__name__)
 
@@ -505,15 +508,181 @@ class RateLimiter:
 rate_limiter = RateLimiter(cache_manager)
 
 
+# ==================== Semantic Cache ====================
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for use in cache keys.
+    
+    Lowercases and collapses whitespace so trivially different spellings of
+    the same question share a key.
+    
+    Args:
+        query: Raw query text
+        
+    Returns:
+        Normalized query text
+        
+    Example:
+        >>> normalize_query("  What is   Quantum Computing? ")
+        'what is quantum computing?'
+    """
+    return _WHITESPACE_RE.sub(" ", query.strip().lower())
+
+
+def _json_default(value: Any) -> Any:
+    """JSON fallback serializer for values stored in the cache."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class SemanticCache:
+    """
+    Two-tier cache for complete research responses.
+    
+    Tier 1 is an exact match on the normalized query text. Tier 2 compares
+    the query embedding with those of recently cached queries and returns
+    the stored response when cosine similarity reaches the threshold.
+    
+    Responses are stored in Redis so every worker can serve them; the
+    embedding index is kept in-process, bounded to ``max_entries`` and
+    evicted least-recently-used first.
+    """
+    
+    def __init__(
+        self,
+        cache: CacheManager,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl: int = 3600,
+        namespace: str = "semcache"
+    ):
+        """
+        Initialize semantic cache.
+        
+        Args:
+            cache: CacheManager instance used for response storage
+            threshold: Minimum cosine similarity for a semantic hit
+            max_entries: Maximum embeddings kept in the in-process index
+            ttl: Response TTL in seconds
+            namespace: Redis key namespace
+        """
+        self.cache = cache
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.namespace = namespace
+        # Redis key -> unit-length query embedding
+        self._index: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+    
+    @property
+    def available(self) -> bool:
+        """Whether the Redis backend is connected."""
+        return self.cache._initialized
+    
+    def _key(self, query: str) -> str:
+        """Build the Redis key for a query."""
+        digest = hashlib.sha256(normalize_query(query).encode()).hexdigest()
+        return f"{self.namespace}:{digest}"
+    
+    async def get_exact(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a response by normalized query text.
+        
+        Args:
+            query: Research query
+            
+        Returns:
+            Cached response or None
+        """
+        return await self.cache.get(self._key(query))
+    
+    async def get_similar(self, embedding: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a response for the most similar cached query.
+        
+        Args:
+            embedding: Query embedding
+            
+        Returns:
+            Cached response or None if no entry reaches the threshold
+        """
+        if not self._index:
+            return None
+        
+        scores = cosine_scores(unit_vector(embedding), self._index.values())
+        best = max(range(len(scores)), key=scores.__getitem__)
+        best_key, best_score = list(self._index)[best], scores[best]
+        
+        if best_score < self.threshold:
+            return None
+        
+        response = await self.cache.get(best_key)
+        if response is None:
+            # Expired in Redis; drop the stale index entry
+            self._index.pop(best_key, None)
+            return None
+        
+        self._index.move_to_end(best_key)
+        logger.debug(f"Semantic cache hit (similarity {best_score:.3f})")
+        return response
+    
+    async def set(
+        self,
+        query: str,
+        response: Dict[str, Any],
+        embedding: Optional[Sequence[float]] = None
+    ) -> bool:
+        """
+        Store a response under the query and, if given, its embedding.
+        
+        Args:
+            query: Research query
+            response: Response dictionary (datetimes are stored as ISO strings)
+            embedding: Optional query embedding for the semantic tier
+            
+        Returns:
+            True if the response was stored
+        """
+        key = self._key(query)
+        stored = await self.cache.set(
+            key,
+            json.dumps(response, default=_json_default),
+            ttl=self.ttl
+        )
+        
+        if stored and embedding:
+            self._index[key] = unit_vector(embedding)
+            self._index.move_to_end(key)
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+        
+        return stored
+
+
+# Global semantic cache instance
+semantic_cache = SemanticCache(
+    cache_manager,
+    threshold=settings.semantic_cache_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+    ttl=settings.cache_ttl
+)
+
+
 # ==================== Cache Decorators ====================
 
-def cache_result(ttl: int = 3600, key_prefix: str = "cache"):
+def cache_result(ttl: int = 3600, key_prefix: str = "cache", ignore: Sequence[str] = ()):
     """
     Decorator to cache function results.
     
     Args:
         ttl: Cache TTL in seconds (default: 1 hour)
         key_prefix: Redis key prefix
+        ignore: Keyword arguments left out of the cache key (e.g. clients)
         
     Example:
         >>> @cache_result(ttl=1800, key_prefix="search")
@@ -526,7 +695,9 @@ def cache_result(ttl: int = 3600, key_prefix: str = "cache"):
             # Generate cache key from function name and arguments
             key_parts = [key_prefix, func.__name__]
             key_parts.extend(str(arg) for arg in args)
-            key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
+            key_parts.extend(
+                f"{k}:{v}" for k, v in sorted(kwargs.items()) if k not in ignore
+            )
             
             cache_key = ":".join(key_parts)
             cache_key_hash = hashlib.md5(cache_key.encode()).hexdigest()
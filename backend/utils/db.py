@@ -25,7 +25,7 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy import (
     Column, Integer, String, Text, DateTime, Float, Boolean,
-    ForeignKey, JSON, select, and_, or_
+    ForeignKey, JSON, select, insert, update, and_, or_
 )
 from sqlalchemy.pool import NullPool, QueuePool
 
@@ -183,10 +183,11 @@ class DatabaseManager:
             self.engine = create_async_engine(
                 settings.postgres_url,
                 echo=settings.debug,
-                pool_size=10,
-                max_overflow=20,
+                pool_size=settings.POSTGRES_POOL_SIZE,
+                max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+                pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
                 pool_pre_ping=True,  # Verify connections before using
-                pool_recycle=3600,   # Recycle connections after 1 hour
+                pool_recycle=settings.POSTGRES_POOL_RECYCLE,  # Drop idle connections
             )
             
             # Create session maker
@@ -240,6 +241,17 @@ class DatabaseManager:
             finally:
                 await session.close()
     
+    def pool_status(self) -> str:
+        """
+        Describe the connection pool's current usage.
+        
+        Returns:
+            Pool status line (size, checked in/out, overflow)
+        """
+        if self.engine is None:
+            return "not initialized"
+        return self.engine.pool.status()
+    
     async def health_check(self) -> bool:
         """
         Check database connectivity.
@@ -410,6 +422,109 @@ async def add_timeline_step(
         return step
 
 
+def _timeline_rows(query_id: int, steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Map agent timeline entries to timeline_steps column values."""
+    return [
+        {
+            "query_id": query_id,
+            "step_name": step["step"],
+            "description": step.get("description", ""),
+            "details": step.get("details"),
+            "timestamp": step.get("timestamp") or datetime.utcnow(),
+            "duration_ms": step.get("duration_ms"),
+            "status": step.get("status", "success"),
+        }
+        for step in steps
+    ]
+
+
+async def bulk_add_timeline_steps(query_id: int, steps: List[Dict[str, Any]]) -> int:
+    """
+    Insert several timeline steps with a single multi-row INSERT.
+    
+    Args:
+        query_id: ID of the parent query
+        steps: Agent timeline entries (step, description, details,
+            timestamp, duration_ms, status)
+        
+    Returns:
+        Number of steps inserted
+    """
+    if not steps:
+        return 0
+    
+    async with db_manager.get_session() as session:
+        await session.execute(insert(TimelineStep), _timeline_rows(query_id, steps))
+    return len(steps)
+
+
+async def complete_research_query(
+    query_id: int,
+    status: str,
+    timeline: List[Dict[str, Any]],
+    completed_at: Optional[datetime] = None,
+    duration_ms: Optional[int] = None,
+    iterations: Optional[int] = None,
+    answer: Optional[str] = None,
+    citations: Optional[List[Dict]] = None,
+    confidence_score: Optional[float] = None,
+    result_id: Optional[int] = None
+) -> None:
+    """
+    Persist the outcome of a research run in one transaction.
+    
+    Updates the query status, saves the result and bulk-inserts the buffered
+    timeline steps, replacing one round-trip per agent node with a single
+    commit. If the result row was already saved (``result_id``), only its
+    confidence score is updated.
+    
+    Args:
+        query_id: ID of the query
+        status: Final status (completed, failed)
+        timeline: Agent timeline entries to insert
+        completed_at: Completion timestamp
+        duration_ms: Total execution duration
+        iterations: Number of reflection iterations
+        answer: Synthesized answer text (skip result row if None)
+        citations: List of citation dictionaries
+        confidence_score: Answer confidence (0.0-1.0)
+        result_id: ID of an already saved ResearchResult to update
+    """
+    values: Dict[str, Any] = {"status": status}
+    if completed_at:
+        values["completed_at"] = completed_at
+    if duration_ms is not None:
+        values["duration_ms"] = duration_ms
+    if iterations is not None:
+        values["iterations"] = iterations
+    
+    async with db_manager.get_session() as session:
+        await session.execute(
+            update(ResearchQuery).where(ResearchQuery.id == query_id).values(**values)
+        )
+        
+        if result_id is not None:
+            await session.execute(
+                update(ResearchResult)
+                .where(ResearchResult.id == result_id)
+                .values(confidence_score=confidence_score)
+            )
+        elif answer is not None:
+            citations = citations or []
+            session.add(ResearchResult(
+                query_id=query_id,
+                answer=answer,
+                citations=citations,
+                citation_count=len(citations),
+                confidence_score=confidence_score
+            ))
+        
+        if timeline:
+            await session.execute(insert(TimelineStep), _timeline_rows(query_id, timeline))
+    
+    logger.info(f"Completed query {query_id} with status {status}")
+
+
 async def get_research_query(query_id: int) -> Optional[ResearchQuery]:
     """
     Retrieve a research query by ID.
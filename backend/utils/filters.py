@@ -8,13 +8,18 @@ This module provides AI safety checks including:
 - Hallucination checking
 - Bias detection
 - Output sanitization
+- Embedding similarity scoring (shared by the semantic cache and ranking)
 
 These filters protect users and ensure responsible AI operation.
 """
 
 import re
 import logging
-from typing import Dict, List, Optional, Tuple
+import math
+from collections import Counter, OrderedDict
+from enum import IntFlag, auto
+from operator import mul
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import hashlib
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,9 @@ PII_PATTERNS = {
     'passport': re.compile(r'\b[A-Z]{1,2}\d{6,9}\b'),  # Passport numbers (simplified)
 }
 
+# Joins texts for batch sanitization; no PII pattern can match across it
+_BATCH_SEPARATOR = "\x00"
+
 # Prompt Injection Patterns
 PROMPT_INJECTION_PATTERNS = [
     re.compile(r'ignore\s+(previous|all)\s+instructions?', re.IGNORECASE),
@@ -41,6 +49,16 @@ PROMPT_INJECTION_PATTERNS = [
     re.compile(r'override\s+your\s+directives', re.IGNORECASE),
 ]
 
+# Each pattern set folded into one alternation so a query is scanned once;
+# named groups tell which PII type matched
+_PII_SCANNER = re.compile(
+    '|'.join(f'(?P<{name}>{pattern.pattern})' for name, pattern in PII_PATTERNS.items())
+)
+_PROMPT_INJECTION_SCANNER = re.compile(
+    '|'.join(f'(?:{pattern.pattern})' for pattern in PROMPT_INJECTION_PATTERNS),
+    re.IGNORECASE
+)
+
 # Toxicity Keywords (basic - should be replaced with ML model in production)
 TOXICITY_KEYWORDS = [
     # Violence
@@ -51,6 +69,21 @@ TOXICITY_KEYWORDS = [
     'explicit', 'pornographic',
 ]
 
+# Substring scan for all keywords at once; the lookahead reports matches at
+# every position, so overlapping keywords are still found
+_TOXICITY_SCANNER = re.compile(
+    '(?=(' + '|'.join(map(re.escape, TOXICITY_KEYWORDS)) + '))'
+)
+
+
+class QueryVerdict(IntFlag):
+    """Bitmask of the safety checks a query failed."""
+    CLEAN = 0
+    PROMPT_INJECTION = auto()
+    PII = auto()
+    TOXIC = auto()
+
+
 # High-confidence hallucination indicators
 HALLUCINATION_INDICATORS = [
     'i think', 'i believe', 'probably', 'maybe', 'might be',
@@ -83,22 +116,7 @@ async def check_pii(text: str) -> bool:
         >>> await check_pii("What is quantum computing?")
         False
     """
-    if not text:
-        return False
-    
-    pii_found = []
-    
-    for pii_type, pattern in PII_PATTERNS.items():
-        matches = pattern.findall(text)
-        if matches:
-            pii_found.append(pii_type)
-            logger.info(f"PII detected: {pii_type} ({len(matches)} occurrences)")
-    
-    if pii_found:
-        logger.warning(f"PII types found: {', '.join(pii_found)}")
-        return True
-    
-    return False
+    return bool(text) and _detect_pii(text)
 
 
 async def check_prompt_injection(text: str) -> bool:
@@ -122,21 +140,7 @@ async def check_prompt_injection(text: str) -> bool:
         >>> await check_prompt_injection("What is AI?")
         False
     """
-    if not text:
-        return False
-    
-    for pattern in PROMPT_INJECTION_PATTERNS:
-        if pattern.search(text):
-            logger.warning(f"Prompt injection pattern detected: {pattern.pattern}")
-            return True
-    
-    # Check for excessive special characters (potential token injection)
-    special_char_ratio = sum(1 for c in text if not c.isalnum() and not c.isspace()) / len(text)
-    if special_char_ratio > 0.3:  # More than 30% special characters
-        logger.warning(f"High special character ratio: {special_char_ratio:.2%}")
-        return True
-    
-    return False
+    return bool(text) and _detect_prompt_injection(text)
 
 
 async def check_toxicity(text: str) -> bool:
@@ -165,13 +169,105 @@ async def check_toxicity(text: str) -> bool:
         >>> await check_toxicity("Tell me about solar energy")
         False
     """
+    return bool(text) and _detect_toxicity(text)
+
+
+async def analyze_query(
+    text: str,
+    checks: QueryVerdict = QueryVerdict.PROMPT_INJECTION | QueryVerdict.PII | QueryVerdict.TOXIC
+) -> QueryVerdict:
+    """
+    Run the query safety checks in one call and fold them into a bitmask.
+    
+    Equivalent to awaiting check_prompt_injection, check_pii and
+    check_toxicity separately, but with one coroutine and no event-loop
+    round trips between the scans. Repeated clean texts are recognised by
+    digest and skip the scans; flagged texts are scanned (and logged)
+    every time.
+    
+    Args:
+        text: Query text to analyze
+        checks: Which checks to run
+        
+    Returns:
+        QueryVerdict with a flag set for every check that fired
+        
+    Example:
+        >>> verdict = await analyze_query("My SSN is 123-45-6789")
+        >>> bool(verdict & QueryVerdict.PII)
+        True
+    """
     if not text:
-        return False
+        return QueryVerdict.CLEAN
+    
+    key = (hashlib.blake2b(text.encode(), digest_size=16).digest(), int(checks))
+    if key in _clean_digests:
+        _clean_digests.move_to_end(key)
+        return QueryVerdict.CLEAN
+    
+    verdict = _analyze(text, checks)
+    if verdict == QueryVerdict.CLEAN:
+        _clean_digests[key] = None
+        if len(_clean_digests) > ANALYSIS_CACHE_SIZE:
+            _clean_digests.popitem(last=False)
+    return verdict
+
+
+# Resent and retried messages repeat verbatim. Only digests of texts that
+# passed every check are remembered, so no query text is kept in memory and
+# each flagged repeat is scanned and logged again.
+ANALYSIS_CACHE_SIZE = 4096
+_clean_digests: "OrderedDict[Tuple[bytes, int], None]" = OrderedDict()
+
+
+def _analyze(text: str, checks: QueryVerdict) -> QueryVerdict:
+    """Run the selected scans over non-empty text."""
+    verdict = QueryVerdict.CLEAN
+    if checks & QueryVerdict.PROMPT_INJECTION and _detect_prompt_injection(text):
+        verdict |= QueryVerdict.PROMPT_INJECTION
+    if checks & QueryVerdict.PII and _detect_pii(text):
+        verdict |= QueryVerdict.PII
+    if checks & QueryVerdict.TOXIC and _detect_toxicity(text):
+        verdict |= QueryVerdict.TOXIC
+    
+    return verdict
+
+
+def _detect_pii(text: str) -> bool:
+    """Scan non-empty text for PII, logging the types found."""
+    pii_found = Counter(match.lastgroup for match in _PII_SCANNER.finditer(text))
+    
+    if pii_found:
+        for pii_type, count in pii_found.items():
+            logger.info(f"PII detected: {pii_type} ({count} occurrences)")
+        logger.warning(f"PII types found: {', '.join(pii_found)}")
+        return True
     
+    return False
+
+
+def _detect_prompt_injection(text: str) -> bool:
+    """Scan non-empty text for injection patterns or token-stuffing."""
+    match = _PROMPT_INJECTION_SCANNER.search(text)
+    if match:
+        logger.warning(f"Prompt injection pattern detected: {match.group()!r}")
+        return True
+    
+    # Check for excessive special characters (potential token injection)
+    special_char_ratio = sum(1 for c in text if not c.isalnum() and not c.isspace()) / len(text)
+    if special_char_ratio > 0.3:  # More than 30% special characters
+        logger.warning(f"High special character ratio: {special_char_ratio:.2%}")
+        return True
+    
+    return False
+
+
+def _detect_toxicity(text: str) -> bool:
+    """Scan non-empty text for toxicity keywords."""
     text_lower = text.lower()
     
     # Check for toxicity keywords
-    detected_keywords = [kw for kw in TOXICITY_KEYWORDS if kw in text_lower]
+    detected_keywords = list(dict.fromkeys(_TOXICITY_SCANNER.findall(text_lower)))
     
     if detected_keywords:
         logger.warning(f"Potential toxic content detected. Keywords: {detected_keywords}")
@@ -319,20 +415,116 @@ async def sanitize_output(text: str) -> str:
     if not text:
         return text
     
-    sanitized = text
+    sanitized = _redact_pii(text)
     
-    # Redact each type of PII
-    sanitized = PII_PATTERNS['ssn'].sub('[SSN_REDACTED]', sanitized)
+    if sanitized != text:
+        logger.info("PII redacted from output")
+    
+    return sanitized
+
+
+async def sanitize_output_batch(texts: List[str]) -> List[str]:
+    """
+    Sanitize several texts with one pass of the PII patterns.
+    
+    The texts are joined with a NUL separator, which none of the PII
+    patterns can match across, redacted once and split back apart.
+    
+    Args:
+        texts: Texts to sanitize
+        
+    Returns:
+        Sanitized texts, in the same order
+        
+    Example:
+        >>> await sanitize_output_batch(["Call 555-123-4567", "No PII here"])
+        ['Call [PHONE_REDACTED]', 'No PII here']
+    """
+    if not texts:
+        return []
+    
+    if any(_BATCH_SEPARATOR in text for text in texts):
+        return [_redact_pii(text) if text else text for text in texts]
+    
+    joined = _BATCH_SEPARATOR.join(texts)
+    sanitized = _redact_pii(joined)
+    
+    if sanitized == joined:
+        return list(texts)
+    
+    logger.info("PII redacted from output")
+    return sanitized.split(_BATCH_SEPARATOR)
+
+
+def _redact_pii(text: str) -> str:
+    """
+    Replace every PII match in text with its redaction placeholder.
+    
+    Args:
+        text: Text to redact
+        
+    Returns:
+        Redacted text
+    """
+    sanitized = PII_PATTERNS['ssn'].sub('[SSN_REDACTED]', text)
     sanitized = PII_PATTERNS['phone'].sub('[PHONE_REDACTED]', sanitized)
     sanitized = PII_PATTERNS['email'].sub('[EMAIL_REDACTED]', sanitized)
     sanitized = PII_PATTERNS['credit_card'].sub('[CARD_REDACTED]', sanitized)
     sanitized = PII_PATTERNS['ip_address'].sub('[IP_REDACTED]', sanitized)
     sanitized = PII_PATTERNS['passport'].sub('[PASSPORT_REDACTED]', sanitized)
+    return sanitized
+
+
+# Stricter patterns for log lines: PII_PATTERNS['phone'] matches almost any
+# pair of digits, which would mangle status codes, counts, IDs and timings.
+# Phone numbers must be E.164 (+ and 7-15 digits) or a national number with
+# a leading 0 and nine more digits. IPv4 addresses need valid octets and are
+# not part of a longer dotted number; the unspecified and loopback addresses
+# identify nobody and are left alone.
+_IPV4_OCTET = r'(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)'
+_LOG_PII_SCANNER = re.compile(
+    r'(?P<PHONE>(?<![\w+])\+\d{7,15}(?!\d)|(?<![\w.])0\d{9}(?!\w|\.\d))'
+    r'|(?P<EMAIL>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    r'|(?P<IP>(?<![\w.])(?!0\.0\.0\.0(?!\.?\d))(?!127\.)'
+    r'(?:' + _IPV4_OCTET + r'\.){3}' + _IPV4_OCTET + r'(?!\.?\d))'
+    r'|(?P<IBAN>\b[A-Z]{2}\d{2}[A-Z0-9]{11,30}\b)'
+)
+
+
+def _log_placeholder(match: re.Match) -> str:
+    """Return the redaction placeholder for a log PII match."""
+    return f'[{match.lastgroup}_REDACTED]'
+
+
+class PIIRedactingFilter(logging.Filter):
+    """
+    Logging filter that masks phone numbers, emails, IPs and IBANs.
     
-    if sanitized != text:
-        logger.info("PII redacted from output")
+    Attach it to handlers rather than a logger so records propagated from
+    every module pass through it; configure_logging() adds it to every root
+    handler, including ones installed by the host process. Behind the QueueListener it runs on the
+    listener thread, where the message already includes any traceback.
     
-    return sanitized
+    Example:
+        >>> handler.addFilter(PIIRedactingFilter())
+    """
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Redact the formatted message of a record in place.
+        
+        Args:
+            record: Log record about to be emitted
+            
+        Returns:
+            Always True; records are masked, never dropped
+        """
+        message = record.getMessage()
+        redacted = _LOG_PII_SCANNER.sub(_log_placeholder, message)
+        if redacted != message:
+            record.msg = redacted
+            record.args = None
+        return True
 
 
 async def contains_pii_in_document(doc: Dict) -> bool:
@@ -436,3 +628,44 @@ def hash_sensitive_data(data: str) -> str:
         'a1b2c3d4...'
     """
     return hashlib.sha256(data.encode()).hexdigest()
+
+
+def unit_vector(vector: Sequence[float]) -> Tuple[float, ...]:
+    """
+    Scale a vector to unit length so its dot product with another unit
+    vector is their cosine similarity.
+    
+    Args:
+        vector: Embedding vector
+        
+    Returns:
+        Normalized vector (the input unchanged if it has zero length)
+    """
+    norm = math.sqrt(sum(map(mul, vector, vector))) or 1.0
+    return tuple(x / norm for x in vector)
+
+
+def cosine_scores(
+    query: Sequence[float],
+    rows: Iterable[Sequence[float]]
+) -> List[float]:
+    """
+    Cosine similarity of one unit vector against many.
+    
+    Both sides must already be normalized with unit_vector(), so each score
+    is a single dot product; normalizing once up front keeps the per-row
+    work to a C-level ``sum(map(mul, ...))``.
+    
+    Args:
+        query: Normalized query vector
+        rows: Normalized candidate vectors
+        
+    Returns:
+        Similarity score per row, in order
+        
+    Example:
+        >>> cosine_scores(unit_vector([1, 0]), [unit_vector([1, 1]), (0.0, 1.0)])
+        [0.7071067811865475, 0.0]
+    """
+    return [sum(map(mul, query, row)) for row in rows]
+
@@ -0,0 +1,115 @@
+"""
+In-Process Metrics Module
+
+This module aggregates research request metrics in memory:
+- Request counts per query source
+- Citation and timeline-step count histograms
+
+Recording is a couple of dictionary increments with no logging or I/O, so
+it can run inline on the request path. Aggregates are read through
+snapshot() (served by /api/metrics).
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Tuple
+
+# Histogram upper bounds; values above the last bound land in "+Inf"
+CITATION_BUCKETS: Tuple[int, ...] = (0, 1, 2, 5, 10, 20, 50)
+STEP_BUCKETS: Tuple[int, ...] = (1, 2, 5, 10, 20, 50)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of non-negative integer observations.
+    
+    Attributes:
+        buckets: Sorted bucket upper bounds (inclusive)
+        counts: Observation count per bucket, plus one overflow bucket
+        total: Sum of all observed values
+    """
+    
+    __slots__ = ("buckets", "counts", "total")
+    
+    def __init__(self, buckets: Tuple[int, ...]):
+        """
+        Initialize an empty histogram.
+        
+        Args:
+            buckets: Sorted bucket upper bounds
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+    
+    def observe(self, value: int) -> None:
+        """
+        Record one observation.
+        
+        Args:
+            value: Observed value
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the histogram as a JSON-serializable dict.
+        
+        Returns:
+            Dict with per-bucket counts, observation count and sum
+        """
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": sum(self.counts),
+            "sum": self.total
+        }
+
+
+class ResearchMetrics:
+    """
+    Aggregated metrics for completed research requests.
+    
+    All updates happen on the event loop thread, so plain counters are safe
+    without locking.
+    """
+    
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self.requests: Counter = Counter()
+        self.citations = Histogram(CITATION_BUCKETS)
+        self.steps = Histogram(STEP_BUCKETS)
+    
+    def record(self, source: str, num_citations: int, num_steps: int) -> None:
+        """
+        Record one completed research request.
+        
+        Args:
+            source: Source of the query (web_ui, sms, api)
+            num_citations: Number of citations in the response
+            num_steps: Number of timeline steps executed
+        
+        Example:
+            >>> research_metrics.record("web_ui", num_citations=5, num_steps=4)
+        """
+        self.requests[source] += 1
+        self.citations.observe(num_citations)
+        self.steps.observe(num_steps)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current aggregates as a JSON-serializable dict.
+        
+        Returns:
+            Request counts by source and the citation/step histograms
+        """
+        return {
+            "research_requests_total": dict(self.requests),
+            "research_citations": self.citations.snapshot(),
+            "research_steps": self.steps.snapshot()
+        }
+
+
+# Global metrics instance
+research_metrics = ResearchMetrics()